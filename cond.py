@@ -1,9 +1,23 @@
 #!/usr/bin/python3
+import ast
+import bisect
+import functools
+import itertools
 import math
+import mmap
 import operator
-from parser import expr
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from multiprocessing import shared_memory
 from string import ascii_uppercase, ascii_lowercase, digits
-from inspect import currentframe
 
 class Cond:
 
@@ -21,6 +35,9 @@ class Cond:
 	Using the append() method on a Cond object will add a new option to that object, so long it doesn't already exist
 	Using the remove() method on a Cond object will remove an existing option from that object, so long it isn't the main option
 	Using the index(value) method on a Cond object will return an integer representing the index of that value in the Cond object's options
+	A name can be given to a Cond object using the "name" keyword argument; it is only a label, so many objects can have the same one
+	Using the getname() method on a Cond object will return its name, or None if it has none
+	Using the observe(callback) method on a Cond object will make callback get called whenever the object changes, until unobserve(callback)
 	Cond objects can be passed to the require function, which will edit their main option based on the given expression
 	The require function cannot affect the options of a Cond object, it can only change its main option to a different one from
 	the available options
@@ -28,11 +45,9 @@ class Cond:
 
 	def __init__(self, *args, **kwargs):
 
-		self.ID = id(self)
-
 		#check if kwargs are correct
 		for kwarg in kwargs:
-			if kwarg not in {"mainpos", "range"}:
+			if kwarg not in {"mainpos", "range", "name"}:
 				raise ValueError("Cond: unknown keyword argument {}".format(kwarg))
 
 		#raise error if no arguments were given
@@ -41,9 +56,9 @@ class Cond:
 
 		#setup mainpos kwarg
 		if "mainpos" in kwargs:
-			self.__MAINPOS = kwargs["mainpos"]
+			mainpos = kwargs["mainpos"]
 		else:
-			self.__MAINPOS = 0
+			mainpos = 0
 
 		#error check range kwarg if it's tuple (if it is int, it's ready to use in range() function)
 		if "range" in kwargs and type(kwargs["range"]) is not int:
@@ -58,53 +73,291 @@ class Cond:
 		if "range" in kwargs:
 			argtype = int
 		else:
-			argtype = type(args[self.__MAINPOS])
+			argtype = type(args[mainpos])
 
 		if argtype not in {int, float, complex}:
 			raise TypeError("Cond: arguments must all be numeric types")
 
-		for arg in args:
+		#check types and duplicates in a single hashed pass
+		if args and set(map(type, args)) != {argtype}:
+			raise TypeError("Cond: arguments must all be of the same type")
 
-			if type(arg) is not argtype:
-				raise TypeError("Cond: arguments must all be of the same type")
+		if len(set(args)) != len(args):
+			raise ValueError("Cond: object cannot have duplicate values")
 
-			elif args.count(arg) != 1:
-				raise ValueError("Cond: object cannot have duplicate values")
-
-		#save the option type in __TYPE, the values in __VALS and the main option in __MAIN
-		self.__TYPE = argtype
-		self.__VALS = []
+		vals = []
 
-		#if range keyword was provided, add the specified range to __VALS
+		#if range keyword was provided, add the specified range to vals
 		if "range" in kwargs:
 			if type(kwargs["range"]) is int and kwargs["range"] <= 0 or type(kwargs["range"]) is tuple and len(kwargs["range"]) > 1 and kwargs["range"][0] >= kwargs["range"][1]:
 				raise ValueError("Cond: bad keyword argument \"range\"")
 			elif type(kwargs["range"]) is int:
 				kwargs["range"] = (kwargs["range"],)
 
-			if len(kwargs["range"]) == 1:
-				self.__VALS.extend(range(kwargs["range"][0]))
-			elif len(kwargs["range"]) == 2:
-				self.__VALS.extend(range(kwargs["range"][0], kwargs["range"][1]))
-			else:
-				self.__VALS.extend(range(kwargs["range"][0], kwargs["range"][1], kwargs["range"][2]))
+			vals.extend(range(*kwargs["range"]))
+
+		if vals:
+			existing = set(vals)
+			vals.extend(arg for arg in args if arg not in existing)
+		else:
+			vals.extend(args)
 
-		for arg in args:
-			if arg not in self.__VALS:
-				self.__VALS.append(arg)
+		self._initOptions(vals, argtype, mainpos, kwargs.get("name"))
 
-		if self.__MAINPOS >= len(self.__VALS):
+		if "range" in kwargs and len(vals) == len(range(*kwargs["range"])):
+			self.__RANGE = range(*kwargs["range"])
+
+	def _initOptions(self, vals, argtype, mainpos, name = None):
+		#save the option type in __TYPE, the values in __VALS and the main option in __MAIN
+		#vals can be a list or an array.array, which is adopted as is
+		if mainpos >= len(vals):
 			raise ValueError("Cond: keyword argument \"mainpos\" out of range")
 
-		self.__MAIN = self.__VALS[self.__MAINPOS]
+		#the name is only a label, used by getlims(); any amount of objects can have the same one
+		if name is not None and (type(name) is not str or not name):
+			raise TypeError("Cond: keyword argument \"name\" must be a non-empty str")
+
+		self.__NAME = name
+
+		self.ID = id(self)
+		self.__TYPE = argtype
+		self.__VALS = vals
+		self.__MAINPOS = mainpos
+		self.__MAIN = self.__VALS[mainpos]
+		#range object equal to the options, if they are known to be one (see _getRange())
+		self.__RANGE = None
+		self.__LOCK = threading.RLock()
+		self.__SERIAL = next(_MainData.serials)
+		#callbacks registered by observe(), or None if there are none, so that changes cost a single check
+		self.__OBSERVERS = None
+
+	@classmethod
+	def from_iterable(cls, iterable, mainpos = 0, name = None):
+
+		'''
+		Creates a Cond object from any iterable (list, tuple, generator, etc), without unpacking it into arguments
+		Types and duplicates are checked in a single hashed pass
+		'''
+
+		vals = list(iterable)
+		if not vals:
+			raise ValueError("Cond.from_iterable(x): x is empty")
+
+		argtype = type(vals[0])
+		if argtype not in {int, float, complex}:
+			raise TypeError("Cond.from_iterable(x): x must only contain numeric types")
+		elif set(map(type, vals)) != {argtype}:
+			raise TypeError("Cond.from_iterable(x): x must only contain values of the same type")
+		elif len(set(vals)) != len(vals):
+			raise ValueError("Cond.from_iterable(x): x cannot contain duplicate values")
+
+		obj = cls.__new__(cls)
+		obj._initOptions(vals, argtype, mainpos, name)
+
+		if type(iterable) is range:
+			obj.__RANGE = iterable
+
+		return obj
+
+	@classmethod
+	def from_buffer(cls, buffer, mainpos = 0, name = None, typecode = None, copy = True):
+
+		'''
+		Creates a Cond object from any one-dimensional object that supports the buffer protocol (array.array, memoryview,
+		NumPy array, etc), whose items are integers or floating point numbers
+		If typecode (an array.array typecode) is given, the memory of buffer is read as items of that type instead; it is required
+		for bytes and bytearray objects, whose items are raw bytes rather than numbers
+		The memory of buffer is copied in bulk into a new array.array; if copy is False and buffer is an array.array, it is adopted
+		without copying instead, meaning that the Cond object will use it to store its options, so changes made to either of them are
+		seen by the other
+		Single precision floating point items are always copied into an array of doubles, so that options set later aren't rounded
+		'''
+
+		try:
+			view = memoryview(buffer)
+		except TypeError:
+			raise TypeError("Cond.from_buffer(x): x must support the buffer protocol, {} does not".format(type(buffer))) from None
+
+		if typecode is not None:
+			if typecode not in _MainData.buffer_formats:
+				raise ValueError("Cond.from_buffer(): bad typecode {}".format(typecode))
+			elif not view.c_contiguous or view.nbytes % struct.calcsize(typecode):
+				raise ValueError("Cond.from_buffer(x): x must be contiguous, and its size must be a multiple of the size of typecode")
+			view = view.cast("B").cast(typecode)
+		elif isinstance(buffer, (bytes, bytearray)):
+			raise TypeError("Cond.from_buffer(x): a typecode must be given when x is {}".format(type(buffer)))
+
+		typecode = _bufferTypecode(view.format)
+		if typecode is None:
+			raise TypeError("Cond.from_buffer(x): unsupported item format {}".format(view.format))
+		elif view.ndim != 1:
+			raise ValueError("Cond.from_buffer(x): x must be one-dimensional")
+		elif not len(view):
+			raise ValueError("Cond.from_buffer(x): x is empty")
+
+		if typecode == "f":
+			vals = array("d", view)
+		elif not copy and type(buffer) is array and buffer.typecode == typecode:
+			vals = buffer
+		else:
+			vals = array(typecode)
+			vals.frombytes(view.cast("B") if view.c_contiguous else view.tobytes())
+
+		if len(set(vals)) != len(vals):
+			raise ValueError("Cond.from_buffer(x): x cannot contain duplicate values")
+
+		obj = cls.__new__(cls)
+		obj._initOptions(vals, float if typecode in "fd" else int, mainpos, name)
+		return obj
+
+	@classmethod
+	def from_file(cls, path, typecode, mainpos = 0, offset = 0, validate = True, name = None):
+
+		'''
+		Creates a Cond object whose options are read from a binary file of fixed-width numbers in native byte order,
+		whose format is given by an array.array typecode (e.g. "q" for 64-bit integers, "d" for doubles)
+		The file is memory-mapped read-only, so its data is paged in lazily by the OS, and options are converted to Python numbers
+		in chunks while iterating; the main option is tracked as an index into the file
+		The options of such an object are read-only: they cannot be reassigned, deleted or added to
+		If validate is False, the file is assumed to not contain duplicate values (checking requires a pass over the whole file)
+		'''
+
+		if typecode not in _MainData.buffer_formats:
+			raise ValueError("Cond.from_file(): bad typecode {}".format(typecode))
+
+		with open(path, "rb") as f:
+			size = os.fstat(f.fileno()).st_size
+			itemsize = struct.calcsize(typecode)
+			if offset < 0 or offset >= size or (size - offset) % itemsize:
+				raise ValueError("Cond.from_file(): file size does not match typecode and offset")
+
+			mapped = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+		vals = _BufferOptions(memoryview(mapped)[offset:].cast(typecode), mapped)
+
+		if validate:
+			seen = set()
+			for chunk in vals.chunks():
+				seen.update(chunk)
+			if len(seen) != len(vals):
+				raise ValueError("Cond.from_file(): file cannot contain duplicate values")
+
+		obj = cls.__new__(cls)
+		obj._initOptions(vals, float if typecode in "fd" else int, mainpos, name)
+		return obj
+
+	@classmethod
+	def attach(cls, handle, mainpos = 0, name = None):
+
+		'''
+		Creates a Cond object whose options are those of a shared memory segment, given by a handle returned by share()
+		The handle can be sent to other processes (e.g. with multiprocessing), which only pickles the name of the segment;
+		the options are then read in place, without being copied
+		'''
+
+		if type(handle) is not _SharedOptions:
+			raise TypeError("Cond.attach(x): x must be a handle returned by share(), not {}".format(type(handle)))
+
+		obj = cls.__new__(cls)
+		obj._initOptions(handle, float if handle.view.format in "fd" else int, mainpos, name)
+		return obj
+
+	@classmethod
+	def from_array(cls, arr, mainpos = 0, name = None, copy = True):
+
+		'''
+		Creates a Cond object from an array.array or a NumPy array
+		Integer and floating point arrays are passed to from_buffer(), along with copy, so array.array objects are adopted without
+		copying if copy is False; other arrays that can be converted to a list (e.g. complex NumPy arrays) are passed to from_iterable()
+		'''
+
+		try:
+			if _bufferTypecode(memoryview(arr).format) is not None:
+				return cls.from_buffer(arr, mainpos, name, copy = copy)
+		except TypeError:
+			pass
+
+		if not hasattr(arr, "tolist"):
+			raise TypeError("Cond.from_array(x): x must be an array, not {}".format(type(arr)))
+
+		return cls.from_iterable(arr.tolist(), mainpos, name)
 
 	def all(self):
 		return self.__VALS
 
+	def getname(self):
+		return self.__NAME
+
 	def _setmain(self, op_index):
+		if self.__OBSERVERS is not None:
+			_recordChange(self, None, self.__MAINPOS, self.__VALS[self.__MAINPOS])
+
 		self.__MAIN = self.__VALS[op_index]
 		self.__MAINPOS = op_index
 
+	def _getmain(self):
+		return self.__MAINPOS
+
+	def _getRange(self):
+		#returns a range object equal to the options of the object, or None if they aren't known to be one
+		#options given by the "range" keyword argument, or passed to from_iterable() as a range, are, until they are changed
+		return self.__RANGE
+
+	def _getLock(self):
+		#returns the lock of the object and its serial number, which gives the order in which locks are acquired (see _Locked)
+		return self.__LOCK, self.__SERIAL
+
+	def __reduce__(self):
+		#the options are passed to _restore(), so that the object is complete before anything that refers to it is unpickled;
+		#the ID, the lock and the name are set up again by _initOptions(), since they only make sense in the process that created them
+		if _MainData.thread.pending:
+			_flushDeferred()
+
+		vals = self.__VALS[:] if type(self.__VALS) is _BufferOptions else self.__VALS
+		return (type(self)._restore, (vals, self.__TYPE, self.__MAINPOS, self.__NAME, self.__RANGE), self._getState())
+
+	@classmethod
+	def _restore(cls, vals, argtype, mainpos, name, options_range):
+		#creates an object from the values given by __reduce__(), or stored by snapshot()
+		obj = cls.__new__(cls)
+		obj._initOptions(vals, argtype, mainpos, name)
+		obj.__RANGE = options_range
+		return obj
+
+	def _getState(self):
+		#state passed to __setstate__() after the object is unpickled, or None if there is none
+		return None
+
+	def _getObservers(self):
+		return self.__OBSERVERS
+
+	def _changed(self, change):
+		#called when the options or the limitations of the object change, before the main option and its index are updated;
+		#change is "options" or "limitations"
+		if self.__OBSERVERS is not None:
+			_recordChange(self, change, self.__MAINPOS, self.__MAIN)
+
+	def _hideMain(self):
+		#used by deferred(): while the main option is hidden, reading it runs the queued require() calls first (see __getattr__)
+		self.__dict__.pop("_Cond__MAIN", None)
+
+	def _isHidden(self):
+		return "_Cond__MAIN" not in self.__dict__
+
+	def __getattr__(self, name):
+		#only called when an attribute isn't found, so objects that aren't waiting for a deferred require() are not slowed down
+		if name == "_Cond__MAIN":
+			if _MainData.thread.pending:
+				_flushDeferred()
+
+			if "_Cond__MAIN" in self.__dict__:
+				return self.__dict__["_Cond__MAIN"]
+			#calls queued by another thread are only run by it, so until then, other threads see the main option from before them
+			elif _hiddenElsewhere((self,)):
+				return self.__VALS[self.__MAINPOS]
+
+		raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
 	def __get__(self):
 		return self.__MAIN
 
@@ -318,8 +571,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __isub__(self, other):
@@ -331,8 +583,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __imul__(self, other):
@@ -344,8 +595,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __ifloordiv__(self, other):
@@ -357,8 +607,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __itruediv__(self, other):
@@ -370,8 +619,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 
@@ -384,8 +632,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 
@@ -398,8 +645,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __ilshift__(self, other):
@@ -411,8 +657,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __irshift__(self, other):
@@ -424,8 +669,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 
@@ -438,8 +682,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __ior__(self, other):
@@ -451,8 +694,7 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
 	def __ixor__(self, other):
@@ -464,10 +706,29 @@ class Cond:
 		if not type(result) is self.__TYPE:
 			raise TypeChangeError("Cond: operation would change main option type")
 
-		self.__MAIN = result		
-		self.__VALS[self.__MAINPOS] = self.__MAIN
+		self.__replaceMain(result)
 		return self
 
+	def __store(self, index, value):
+		#sets the option at index to value, or appends value if index is None; options stored in an array.array of a narrow type
+		#can't hold every value
+		try:
+			if index is None:
+				self.__VALS.append(value)
+			else:
+				self.__VALS[index] = value
+		except OverflowError:
+			raise ValueError("Cond: value {} does not fit in the object's options, which are stored as \"{}\" items".format(value, self.__VALS.typecode)) from None
+
+	def __replaceMain(self, result):
+		#used by the in-place operators, to replace the main option with the result of the operation
+		with _Locked((self,)):
+			self.__store(self.__MAINPOS, result)
+			self._changed("options")
+			self.__MAIN = result
+			self.__RANGE = None
+			self._optionsChanged("set", self.__MAINPOS)
+
 	def __int__(self):
 		return int(self.__MAIN)
 
@@ -516,34 +777,65 @@ class Cond:
 		return self.__VALS[ind]
 
 	def __setitem__(self, ind, value):
-		if type(ind) is not int:
-			raise TypeError("Cond: assignment indices must be integers, not {}".format(type(ind)))
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-		elif type(value) is not self.__TYPE:
-			raise TypeError("Cond: object's type is {}, but value given was of type {}".format(self.__TYPE, type(value)))
+		with _Locked((self,)):
+			if type(ind) is not int:
+				raise TypeError("Cond: assignment indices must be integers, not {}".format(type(ind)))
 
-		elif ind >= len(self.__VALS):
-			raise IndexError("Cond: index out of range")
+			if ind < 0:
+				ind += len(self.__VALS)
+
+			if type(value) is not self.__TYPE:
+				raise TypeError("Cond: object's type is {}, but value given was of type {}".format(self.__TYPE, type(value)))
+
+			elif ind >= len(self.__VALS) or ind < 0:
+				raise IndexError("Cond: index out of range")
 
-		elif ind == self.__MAINPOS:
-			raise ValueError("Cond: object's current option cannot be changed by assignment")
+			elif ind == self.__MAINPOS:
+				raise ValueError("Cond: object's current option cannot be changed by assignment")
 
-		self.__VALS[ind] = value
+			self.__store(ind, value)
+			self._changed("options")
+			self.__RANGE = None
+			self._optionsChanged("set", ind)
 
 	def __delitem__(self, ind):
-		if type(ind) not in {int, slice}:
-			raise TypeError("Cond: deletion indices must be integers or slices, not {}".format(type(ind)))
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-		elif type(ind) is int and ind >= len(self.__VALS):
-			raise IndexError("Cond: index out of range")
+		with _Locked((self,)):
+			if type(ind) not in {int, slice}:
+				raise TypeError("Cond: deletion indices must be integers or slices, not {}".format(type(ind)))
+
+			elif type(ind) is int and (ind >= len(self.__VALS) or ind < -len(self.__VALS)):
+				raise IndexError("Cond: index out of range")
 
-		elif type(ind) is int and ind == self.__MAINPOS:
-			raise ValueError("Cond: object's current option cannot be deleted")
+			#indexes to delete, from highest to lowest, so that deleting one doesn't change the others
+			removed = sorted(range(len(self.__VALS))[ind], reverse = True) if type(ind) is slice else [ind % len(self.__VALS)]
 
-		elif type(ind) is slice and self.__MAINPOS >= ind.start and self.__MAINPOS < ind.stop:
-			raise ValueError("Cond: object's current option's index was contained in given slice, but cannot be deleted")
+			if type(ind) is int and self.__MAINPOS in removed:
+				raise ValueError("Cond: object's current option cannot be deleted")
 
-		del self.__VALS[ind]
+			elif self.__MAINPOS in removed:
+				raise ValueError("Cond: object's current option's index was contained in given slice, but cannot be deleted")
+
+			del self.__VALS[ind]
+			for index in removed:
+				self.__removed(index)
+
+	def __removed(self, index):
+		#keep main option index pointing to the same option, after the option at index was removed
+		self._changed("options")
+		if index < self.__MAINPOS:
+			self.__MAINPOS -= 1
+		self.__RANGE = None
+		self._optionsChanged("remove", index)
+
+	def _optionsChanged(self, action, index):
+		#called after the options change; action is "append", "remove" or "set", and index is the index of the affected option
+		pass
 
 	def __iter__(self):
 		return iter(self.__VALS)
@@ -552,24 +844,40 @@ class Cond:
 		return value in self.__VALS
 
 	def __copy__(self):
+		if _MainData.thread.pending:
+			_flushDeferred()
+
 		newObj = Cond(*self.__VALS, mainpos = self.__MAINPOS)
 		return newObj
 
 	def append(self, value):
-		if type(value) is not self.__TYPE:
-			raise TypeError("Cond.append(x): object's type is {}, while x's type is {}".format(self.__TYPE, type(value)))
-		elif value in self.__VALS:
-			raise ValueError("Cond.append(x): x contained in object")
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-		self.__VALS.append(value)
+		with _Locked((self,)):
+			if type(value) is not self.__TYPE:
+				raise TypeError("Cond.append(x): object's type is {}, while x's type is {}".format(self.__TYPE, type(value)))
+			elif value in self.__VALS:
+				raise ValueError("Cond.append(x): x contained in object")
+
+			self.__store(None, value)
+			self._changed("options")
+			self.__RANGE = None
+			self._optionsChanged("append", len(self.__VALS) - 1)
 
 	def remove(self, value):
-		if value not in self.__VALS:
-			raise ValueError("Cond.remove(x): x not in options")
-		elif value == self.__MAIN:
-			raise ValueError("Cond.remove(x): x is main option")
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-		self.__VALS.remove(value)
+		with _Locked((self,)):
+			if value not in self.__VALS:
+				raise ValueError("Cond.remove(x): x not in options")
+			elif value == self.__MAIN:
+				raise ValueError("Cond.remove(x): x is main option")
+
+			index = self.__VALS.index(value)
+			del self.__VALS[index]
+			self.__removed(index)
 
 	def index(self, value):
 		if value not in self.__VALS:
@@ -577,6 +885,72 @@ class Cond:
 
 		return self.__VALS.index(value)
 
+	def share(self):
+
+		'''
+		Moves the options of the object to a shared memory segment, and returns a handle to it, which can be passed to Cond.attach()
+		After this, the options of the object are read-only; the segment is freed once the object, and all objects attached to
+		the segment in the same process, no longer exist
+		If the options are already in a shared memory segment, the existing handle is returned
+		'''
+
+		if _MainData.thread.pending:
+			_flushDeferred()
+
+		with _Locked((self,)):
+			if type(self.__VALS) is _SharedOptions:
+				return self.__VALS
+			elif self.__TYPE is complex:
+				raise TypeError("Cond.share(): complex options cannot be shared")
+
+			if type(self.__VALS) is array:
+				typecode = self.__VALS.typecode
+			elif type(self.__VALS) is _BufferOptions:
+				typecode = self.__VALS.view.format
+			else:
+				typecode = "d" if self.__TYPE is float else "q"
+
+			try:
+				vals = array(typecode, self.__VALS)
+			except OverflowError:
+				raise ValueError("Cond.share(): options must fit in 64-bit integers") from None
+
+			self.__VALS = _SharedOptions(None, typecode, len(vals), vals)
+			return self.__VALS
+
+	def observe(self, callback):
+
+		'''
+		Registers callback to be called whenever the main option, the options or the limitations of the object change
+		It is called as callback(obj, old_index, new_index, changes), where old_index and new_index are the indexes of the main option
+		before and after the change, and changes is a frozenset holding "main" (if the main option changed), "options" (if options
+		were set, appended or removed) and "limitations" (if limitations were added or removed)
+		Changes are batched: a require call (or any other call) that changes the object many times calls callback only once, after it
+		has finished, and doesn't call it at all if the main option ends up as it was and nothing else changed
+		'''
+
+		if not callable(callback):
+			raise TypeError("Cond.observe(f): f must be callable")
+
+		with _Locked((self,)):
+			if self.__OBSERVERS is None:
+				self.__OBSERVERS = []
+			self.__OBSERVERS.append(callback)
+
+	def unobserve(self, callback):
+
+		'''
+		Stops calling callback, which was registered by observe(), when the object changes
+		'''
+
+		with _Locked((self,)):
+			if self.__OBSERVERS is None or callback not in self.__OBSERVERS:
+				raise ValueError("Cond.unobserve(f): f is not observing the object")
+
+			self.__OBSERVERS.remove(callback)
+			if not self.__OBSERVERS:
+				self.__OBSERVERS = None
+
 
 class LinkedCond(Cond):
 
@@ -586,495 +960,2914 @@ class LinkedCond(Cond):
 	Is "linked" to other LinkedCond objects that have had the same limitation(s) set on them
 	Adds new methods:
 	-> clearlims(): removes limitations from object, and all other LinkedCond objects linked to it
-	-> getlims(): returns set of limitations for object; inside each expression, if the variable names for
-	the objects involved are found, they will be used; otherwise, the variable names used when require() was
-	called will be used
+	-> getlims(): returns set of limitations for object; inside each expression, if all the objects involved have
+	names (given by the "name" keyword argument), they will be used; otherwise, the variable names used when require()
+	was called will be used
+	-> consistent(): returns True if the main options of the object and all objects linked to it satisfy their limitations
+	The combinations that satisfy the limitations of linked objects are cached, and when options are added, removed or changed,
+	only the combinations that include the affected option are re-evaluated
 	'''
 
-	def __init__(self, *args, **kwargs):
-		super().__init__(*args, **kwargs)
-		self.__LIMS = []
+	def _initOptions(self, vals, argtype, mainpos, name = None):
+		super()._initOptions(vals, argtype, mainpos, name)
+		#limitations are kept as dict keys, which acts as an ordered set
+		self.__LIMS = {}
+		#cached _Component shared by all objects linked to this one, or None if it has to be recomputed
+		self.__COMPONENT = None
 
 	def _addLim(self, lim):
-		self.__LIMS.append(lim)
+		if lim not in self.__LIMS:
+			self._changed("limitations")
+			self.__LIMS[lim] = None
 
 	def _getLimsRepr(self):
-		return list(self.__LIMS)
+		#a tuple is returned, so that the limitations can be read while other threads add limitations to the object
+		return tuple(self.__LIMS)
 
-	def clearlims(self):
-		for limitation in list(self.__LIMS):
-			for linked_cond in limitation[1]:
-				linked_cond.__LIMS.remove(limitation)
+	def _setComponent(self, component):
+		self.__COMPONENT = component
 
-	def getlims(self):
-		lims = set()
-		var_not_found = False
-		for lim_repr in self.__LIMS:
-			expression =  _interpretExpression(lim_repr[0], len(lim_repr[1]), return_str = True)
-
-			variables_to_varnames = _mapVariablesToCond(expression, lim_repr[1])
-			prev_scope = currentframe().f_back.f_locals
-
-			for var in variables_to_varnames:
-				for varname in prev_scope:
-					if variables_to_varnames[var] is prev_scope[varname]:
-						variables_to_varnames[var] = varname
-					elif type(prev_scope[varname]) is dict:
-						for key in prev_scope[varname]:
-							if variables_to_varnames[var] is prev_scope[varname][key]:
-								variables_to_varnames[var] = "{}[{}]".format(varname, key)
-
-					else:
-						try:
-							for element in prev_scope[varname]:
-								if element is variables_to_varnames[var]:
-									variables_to_varnames[var] = "{}[{}]".format(varname, prev_scope[varname].index(element))
-						except TypeError:
-							pass
-
-			new_expression = ""
-
-			for c in expression:
-				if c.isalpha():
-					try:
-						new_expression += variables_to_varnames[c]
-					except TypeError:
-						var_not_found = True
-						break
-				else:
-					new_expression += c
+	def _getState(self):
+		return (tuple(self.__LIMS), self.__COMPONENT)
 
-			if var_not_found:
-				lim = "{} {} ".format(expression, lim_repr[2])
-			else:
-				lim = "{} {} ".format(new_expression, lim_repr[2])
+	def __setstate__(self, state):
+		limitations, component = state
+		self.__LIMS = dict.fromkeys(limitations)
+		self.__COMPONENT = component
 
-			if len(lim_repr[3]) > 1:
-				lim += str(lim_repr[3])
-			else:
-				lim += str(lim_repr[3][0])
+	def _getComponent(self):
+		#returns the _Component of the object, computing it if it isn't cached, or None if the object has no limitations
+		if self.__COMPONENT is not None:
+			return self.__COMPONENT
+		elif not self.__LIMS:
+			return None
 
-			lims.add(lim)
+		linked_cond_objects, limitations = _linkedClosure((self,))
+		component = _Component.solve(limitations)
 
-		return lims
+		#components with limitations that depend on the main options of other objects cannot be cached
+		if component.cacheable:
+			for linked_cond in linked_cond_objects:
+				linked_cond.__COMPONENT = component
 
+		return component
 
+	def _optionsChanged(self, action, index):
+		if self.__COMPONENT is not None:
+			self.__COMPONENT.update(self, action, index)
+		_MainData.nogoods.forget(self)
 
-'''
-PRIVATE
-Stores values that are reused by functions so they aren't constantly allocated and freed
-'''
-class _MainData:
-	evaluation_signs = {"=": operator.eq, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "!=": operator.ne}
-	operation_signs = {"+", "-", "*", "/", "%", "^"}
-	accepted_characters = set(ascii_uppercase + ascii_lowercase + digits) | operation_signs | {" ", "(", ")"}
+	def clearlims(self):
+		if _MainData.thread.pending:
+			_flushDeferred()
 
+		with _Locked((self,)):
+			linked_cond_objects = _linkedClosure((self,))[0]
 
+			for limitation in list(self.__LIMS):
+				for linked_cond in limitation.cond_objects:
+					if limitation in linked_cond.__LIMS:
+						linked_cond._changed("limitations")
+						del linked_cond.__LIMS[limitation]
 
-def require(expression, cond_objects, eval_sign, eval_num):
+			#the remaining linked objects may now belong to different components, and limitations that failed with the removed
+			#limitations may not fail anymore
+			for linked_cond in linked_cond_objects:
+				linked_cond.__COMPONENT = None
+				_MainData.nogoods.forget(linked_cond)
 
-	'''
-	require function
-	Used to set limitations for Cond/LinkedCond objects
-	Input arguments:
-	-> expression: a mathematical expression to evaluate; essentially the "left part" of the equation
-	every variable that is part of the expression must be single-letter; it corresponds to exactly one Cond object
-	-> cond_objects: the Cond objects to replace the variables in the expression with; can be tuple of Conds or simply Cond
-	must include exactly the same amount of arguments as variables in the expression
-	LinkedCond and Cond objects cannot be used at the same time (it would link non-LinkedCond objects, which isn't possible)
-	->eval_sign: evaluation sign to be used; must be =, >, >=, <, <=, !=
-	->eval_num: evaluation number to be used; can be any numeric type or Cond, but not expression; 
-	for != sign, multiple eval nums can be passed as a type tuple
-	The require function will go through all combinations for the options of all involved Cond objects and attempt to find
-	a combination, which satisfies the equation; if such options are found, the main option(s) of the Cond object(s) passed
-	will be changed to those new options and True will be returned; otherwise, the Cond objects will not be changed in any way
-	and False will be returned
-	Similarly, for LinkedCond objects, all combinations which satisfy each limitation will be found; then, the "intersection" will
-	be found (meaning a combination to satisfy all limitations); if such a combination exists, the main option(s) of all LinkedCond
-	objects involved will be set to those; NOTE: LinkedCond objects, since they are linked, can be changed indirectly (refer to README)
-	'''
+	def getlims(self):
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-	#if evaluation sign is unknown
-	if eval_sign not in _MainData.evaluation_signs.keys():
-		raise ValueError("require(): bad evaluation sign")
-	#if evaluation number is of incorrect type
-	elif type(eval_num) not in {Cond, LinkedCond, int, float, complex, tuple}:
-		raise TypeError("require(): bad evaluation number")
-	#if cond_objects is of incorrect type
-	elif type(cond_objects) not in {tuple, Cond, LinkedCond}:
-		raise TypeError("require(): bad cond_objects argument")
+		with _Locked((self,)):
+			return {limitation.text for limitation in self.__LIMS}
 
-	if type(cond_objects) in {Cond, LinkedCond}:
-		condtype = type(cond_objects)
-		cond_objects = (cond_objects,)
-	else:
-		condtype = type(cond_objects[0])
-		for cond_object in cond_objects:
-			if type(cond_object) not in {Cond, LinkedCond}:
-				raise TypeError("require(): bad cond_objects argument")
-			elif type(cond_object) is not condtype:
-				raise TypeError("require(): cannot evaluate expression with both Cond and LinkedCond objects")
+	def consistent(self):
+		if _MainData.thread.pending:
+			_flushDeferred()
 
-	if type(eval_num) is not tuple:
-		eval_num = (eval_num,)
+		with _Locked((self,)):
+			component = self._getComponent()
+			return component is None or component.consistent
 
-	if len(eval_num) != 1 and eval_sign != "!=":
-		raise ValueError("require(): expected single eval_num, but got multiple")
 
-	#interpret expression given by user
-	formula = _interpretExpression(expression, len(cond_objects))
+class SolutionSet:
 
-	#if expression was wrong
-	if formula is None:
-		raise ValueError("require(): bad expression")
+	'''
+	SolutionSet class
+	Holds combinations of options of Cond objects in columnar form: every Cond object has one column, which holds the index
+	of its option in each combination; the order of the columns is fixed, and is given by the conds() method
+	Calling len() on a SolutionSet object will return the amount of combinations that it holds
+	A SolutionSet object can be used as an iterable, yielding each combination as a tuple of option indexes, in the order of the columns
+	Using the [] syntax, the combination at the given index can be accessed
+	Using the position(cond) method will return the index of the column of the given Cond object, or None if it has no column
+	Using the column(cond) method will return a memoryview of the column of the given Cond object, without copying it;
+	it can be used with anything that supports the buffer protocol, e.g. numpy.asarray()
+	Using the values(cond) method will return a list of the options of the given Cond object, one for each combination
+	'''
 
-	#find total variables in expression
-	variables_found = []
-	total_variables = 0
-	for c in expression:
-		if c.isalpha() and c not in variables_found:
-			total_variables += 1
-			variables_found.append(c)
+	def __init__(self, cond_objects):
+		self.__CONDS = tuple(cond_objects)
+		self.__POSITIONS = {id(cond_object): i for i, cond_object in enumerate(self.__CONDS)}
+		self.__COLS = [array("q") for cond_object in self.__CONDS]
 
-	#if number of variables is different than number of Cond objects, throw error
-	if total_variables != len(cond_objects):
-		raise ValueError("require(): number of Cond objects passed was different than number of individual variables in expression")
+	def conds(self):
+		return self.__CONDS
 
-	#map single-letter variables to corresponding Cond objects
-	variables_to_cond = _mapVariablesToCond(expression, cond_objects)
+	def position(self, cond_object):
+		pos = self.__POSITIONS.get(id(cond_object))
+		if pos is not None and self.__CONDS[pos] is cond_object:
+			return pos
+		return None
 
-	#call recursive function which checks all combinations of options of all given Cond objects 
-	#empty dicts need to be passed, because function is recursive, so it needs to pass data to deeper recursion levels
-	if condtype is Cond:
-		resulting_combinations = _findCombination(formula, variables_to_cond, len(variables_to_cond) - 1, len(variables_to_cond) - 1, {}, {}, eval_sign, eval_num, None)
-	else:
-		satisfied_limitations = set() #keep satisfied limitations here to not run more than once for each limitation
-		resulting_combinations = [] #list showcasing the resulting combinations
-		first_lim = True
+	def column(self, cond_object):
+		pos = self.position(cond_object)
+		if pos is None:
+			raise ValueError("SolutionSet.column(x): x has no column")
 
-		#get every object that's linked to given cond objects
-		linked_cond_objects = list(cond_objects)
-		for cond_object in cond_objects:
-			for limitation in cond_object._getLimsRepr():
-				for linked_cond_object in limitation[1]:
-					exists = False
-					for existing_object in linked_cond_objects:
-						if existing_object is linked_cond_object:
-							exists = True
-							break
-					if not exists:
-						linked_cond_objects.append(linked_cond_object)
-
-		#loop through every cond object currently linked
-		for cond_object in linked_cond_objects:
+		return memoryview(self.__COLS[pos])
 
-			#for every limitation of current object
-			for limitation in cond_object._getLimsRepr():
+	def values(self, cond_object):
+		options = cond_object.all()
+		return [options[i] for i in self.column(cond_object)]
 
-				#check if limitation hasn't already been satisfied
-				isSatisfied = False
-				for l in satisfied_limitations:
-					if _limEquals(l, limitation):
-						isSatisfied = True
-						break
+	def _addRow(self, row):
+		for col, index in zip(self.__COLS, row):
+			col.append(index)
 
-				if not isSatisfied:
-					#interpret the limitation as a formula
-					lim_formula = _interpretExpression(limitation[0], len(limitation[1]))
-					#map variables of limitation expression to corresponding Cond objects
-					lim_variables_to_cond = _mapVariablesToCond(limitation[0], limitation[1])
-					#get set containing all combinations for Cond objects included in limitation
-					result = _findCombination(lim_formula, lim_variables_to_cond, len(lim_variables_to_cond) - 1, len(lim_variables_to_cond) - 1, {}, {}, limitation[2], limitation[3], set())
+	def _copy(self):
+		copy = SolutionSet(self.__CONDS)
+		copy._extend(self)
+		return copy
 
-					if not result:
-						return False
+	def _extend(self, other):
+		#adds all combinations of other, which must have the same Cond objects, possibly in different order
+		for col, cond_object in zip(self.__COLS, self.__CONDS):
+			col.extend(other.column(cond_object))
 
-					#if it is first time looping, keep all results
-					if first_lim:
-						resulting_combinations = result
-						first_lim = False
-					#else, keep only those results that existed before
-					else:
-						resulting_combinations = _updateResultingCombinations(resulting_combinations, result)
+	def _dropOption(self, cond_object, index, shift):
+		#removes all combinations where cond_object has the option at index; if shift is True, the option was removed
+		#from the object, so greater indexes of it are decreased by one
+		pos = self.position(cond_object)
+		target = self.__COLS[pos]
+		keep = [i for i in range(len(target)) if target[i] != index]
 
-					satisfied_limitations.add(limitation)
+		if len(keep) != len(target):
+			self.__COLS = [array("q", [col[i] for i in keep]) for col in self.__COLS]
 
-		#get results of new equation given by user
-		result = _findCombination(formula, variables_to_cond, len(variables_to_cond) - 1, len(variables_to_cond) - 1, {}, {}, eval_sign, eval_num, set())
+		if shift:
+			self.__COLS[pos] = array("q", [option - 1 if option > index else option for option in self.__COLS[pos]])
 
-		if not result:
-			return False
+	def __len__(self):
+		if not self.__COLS:
+			return 0
+		return len(self.__COLS[0])
 
-		#keep only results that satisfy this equation too
-		if first_lim:
-			resulting_combinations = result
-		else:
-			resulting_combinations = _updateResultingCombinations(resulting_combinations, result)			
+	def __getitem__(self, ind):
+		if type(ind) is not int:
+			raise TypeError("SolutionSet: access indices must be integers, not {}".format(type(ind)))
 
-	#if None was returned, no combination was found
-	if not resulting_combinations:
-		return False
+		return tuple(col[ind] for col in self.__COLS)
 
-	result = resulting_combinations
+	def __iter__(self):
+		return zip(*self.__COLS)
 
-	#if dict was returned, it contains IDs of objects and corresponding indexes
-	#so for each Cond object, set their main option to given index
-	if type(resulting_combinations) is dict:
-		for CondObjID in resulting_combinations:
-			for CondObj in cond_objects:
-				if CondObj.ID == CondObjID:
-					CondObj._setmain(result[CondObjID])
-					break
-	#else it is list, which means dealing with LinkedCond objects
-	#so pick the first combination in resulting_combinations and set their main options to the corresponding option
-	else:
-		#pick first combination
-		final_comb_dict = resulting_combinations[0]
-		
-		for cond_object in linked_cond_objects:
-			#set new main option for LinkedCond object
-			cond_object._setmain(final_comb_dict[cond_object.ID])
-
-			#check if LinkedCond object was contained in given expression
-			contained = False
-			for passed_cond_object in cond_objects:
-				if passed_cond_object.ID == cond_object.ID:
-					contained = True
-					break
+	def __repr__(self):
+		return "SolutionSet({} combinations of {} objects)".format(len(self), len(self.__CONDS))
 
-			#if it was, add limitation to it
-			if contained:
-				cond_object._addLim((expression, cond_objects, eval_sign, eval_num))
-			
+	def __reduce__(self):
+		#the positions of the columns are kept by the IDs of the objects, so they are found again when unpickled
+		return (SolutionSet._restore, (self.__CONDS, self.__COLS))
 
-	return True
+	@classmethod
+	def _restore(cls, cond_objects, columns):
+		solution_set = cls(cond_objects)
+		solution_set.__COLS = columns
+		return solution_set
 
 
 '''
 PRIVATE
-Takes input_set of format: s = {((1, 2),), ((3, 4), (5, 6))}
-Turns into list of dicts: l = [{1: 2}, {3: 4, 5: 6}]
-Returns list of dicts
+Read-only option storage for Cond objects, backed by a memoryview of fixed-width numbers (e.g. over a memory-mapped file)
+Supports the list operations that Cond needs to read its options; iterating converts the view to Python numbers in chunks,
+so large storages are streamed instead of being loaded at once
+source is the object that owns the memory of the view, and is kept alive along with it
 '''
-def _convertToListOfDicts(input_set):
-	result = []
+class _BufferOptions:
+
+	chunk_size = 1 << 16
+
+	def __init__(self, view, source):
+		self.view = view
+		self.source = source
+
+	def __len__(self):
+		return len(self.view)
+
+	def __getitem__(self, ind):
+		if type(ind) is slice:
+			return self.view[ind].tolist()
+		return self.view[ind]
+
+	def __setitem__(self, ind, value):
+		raise TypeError("Cond: options are read-only")
 
-	for tuple_item in input_set:
-		repr_dict = {}
-		for map_tuple in tuple_item:
-			repr_dict[map_tuple[0]] = map_tuple[1]
+	def __delitem__(self, ind):
+		raise TypeError("Cond: options are read-only")
+
+	def append(self, value):
+		raise TypeError("Cond: options are read-only")
+
+	def remove(self, value):
+		raise TypeError("Cond: options are read-only")
+
+	def chunks(self):
+		for start in range(0, len(self.view), self.chunk_size):
+			yield self.view[start:start + self.chunk_size].tolist()
+
+	def __iter__(self):
+		for chunk in self.chunks():
+			yield from chunk
 
-		result.append(repr_dict)
+	def __contains__(self, value):
+		for chunk in self.chunks():
+			if value in chunk:
+				return True
+		return False
+
+	def index(self, value):
+		start = 0
+		for chunk in self.chunks():
+			if value in chunk:
+				return start + chunk.index(value)
+			start += len(chunk)
+		raise ValueError("{} is not in options".format(value))
+
+	def __repr__(self):
+		return "{}({})".format(type(self).__name__, self[:])
 
-	return result
 
 '''
 PRIVATE
-Combines all combinations and returns new list
-with all resulting combinations
+Read-only option storage in a multiprocessing.shared_memory segment; instances are the handles returned by Cond.share()
+Pickling an instance only pickles the name of the segment, its typecode and its length, and unpickling it attaches to the segment,
+so Cond objects using it can be sent to other processes without copying their options
+Segments are reference-counted per process in _MainData.segments; a segment is closed once no storage in the process uses it, and
+unlinked if the process created it
+If data is given, a new segment is created and data (an array.array) is copied into it; otherwise, the named segment is attached
 '''
+class _SharedOptions(_BufferOptions):
 
-def _updateResultingCombinations(resulting_combinations, result):
-	new_resulting_combinations = []
+	def __init__(self, segment_name, typecode, length, data = None):
+		entry = _MainData.segments.get(segment_name)
 
-	for dict1 in resulting_combinations:
-		for dict2 in result:
-			#if all common keys for two dicts have same values
-			if _checkCommonKeys(dict1, dict2):
-				#create dict with all entries from both dicts
-				dict1.update(dict2)
-				#if dict isn't in new combinations list, add it
-				if dict1 not in new_resulting_combinations:
-					new_resulting_combinations.append(dict1)
+		#entries inherited from a parent process through fork are not valid in this one
+		if entry is None or entry[3] != os.getpid():
+			if data is not None:
+				segment = shared_memory.SharedMemory(create = True, size = max(len(data) * data.itemsize, 1))
+				segment.buf[:len(data) * data.itemsize] = memoryview(data).cast("B")
+			else:
+				segment = _openSegment(segment_name)
 
+			entry = [segment, 0, data is not None, os.getpid()]
+			_MainData.segments[segment.name] = entry
 
-	return new_resulting_combinations
+		entry[1] += 1
+		view = entry[0].buf[:length * struct.calcsize(typecode)].cast(typecode)
+		super().__init__(view, entry[0])
+		self.segment_name = entry[0].name
+		weakref.finalize(self, _releaseSegment, self.segment_name, view)
 
+	def __reduce__(self):
+		return (_SharedOptions, (self.segment_name, self.view.format, len(self.view)))
 
 
 '''
 PRIVATE
-Returns True if all common keys in two dicts have same value
-Else False
-(for no common keys, returns True)
+Some of the options of a Cond object, given by their indexes; used in place of the object in the variables_to_cond dict
+passed to _findCombination, so that only those options are tested
 '''
-def _checkCommonKeys(dict1, dict2):
-	all_common = True
-	for key in dict1:
-		if key in dict2:
-			if dict1[key] != dict2[key]:
-				all_common = False
-				break
+class _OptionSubset:
 
-	return all_common
+	def __init__(self, cond_object, indexes):
+		self.cond_object = cond_object
+		self.indexes = indexes
+
+	def enumerate(self):
+		options = self.cond_object.all()
+		for index in self.indexes:
+			yield index, options[index]
 
 
 '''
 PRIVATE
-Accepts given expression and given cond_objects as arguments
-Maps each individual single-letter variable to a given cond object
-Returns dictionary with keys mapped to values
+State kept separately by every thread
 '''
-def _mapVariablesToCond(expression, cond_objects):
-
-	variables_to_cond = {}
-	i = 0
-	for c in expression:
-		if c.isalpha() and c not in variables_to_cond.keys():
-			variables_to_cond[c] = cond_objects[i]
-			i += 1
+class _ThreadState(threading.local):
 
-	return variables_to_cond
+	def __init__(self):
+		self.contexts = [] #deferred() contexts that are currently entered by the thread, innermost last
+		self.pending = [] #require() calls queued inside the thread's deferred() contexts, as (context, position, expression, eval_sign, checked arguments, hidden objects)
+		self.depth = 0 #amount of _Locked blocks that the thread is in
+		self.changes = None #changes kept by _recordChange() until the thread leaves all _Locked blocks, or None if there are none
 
 
 '''
 PRIVATE
-changes expression slightly and parses it using parser.expr, returns expression in code that can be evaluated with eval()
+Bounded store of nogoods: limitations that are known to have no combination that satisfies them along with the limitations of the
+LinkedCond objects linked to their objects, so that require() calls that are repeated on an unchanged network fail immediately
+Adding limitations can't make such a limitation satisfiable, so a nogood stays valid until limitations are removed from, or options
+are changed in, any of the objects it was found for; it is then dropped by forget(), using an index of the nogoods of each object
+When the store is full, the least recently used nogood is dropped
+This only memoizes failed requirements: a nogood is only used for a call with an identical limitation, and is never used to prune the
+options searched by other calls
 '''
-def _interpretExpression(expression, cond_obj_amount, return_str = False):
+class _NogoodStore:
+
+	def __init__(self, limit):
+		self.limit = limit
+		#maps keys of limitations to tuples of (ID, weak reference) of the objects they were found for, least recently used first
+		self.entries = {}
+		#maps IDs of objects to the set of keys of the nogoods found for them
+		self.index = {}
+		self.lock = threading.Lock()
+
+	def known(self, limitation):
+		#returns True if limitation is a nogood; IDs in the key can only belong to other objects once the objects are gone
+		with self.lock:
+			entry = self.entries.pop(limitation.key, None)
+			if entry is None:
+				return False
+			elif any(ref() is None for object_id, ref in entry):
+				self.__unindex(limitation.key, entry)
+				return False
+
+			self.entries[limitation.key] = entry
+			return True
+
+	def record(self, limitation, linked_cond_objects):
+		with self.lock:
+			entry = self.entries.pop(limitation.key, None)
+			if entry is not None:
+				self.__unindex(limitation.key, entry)
+
+			entry = tuple((id(cond_object), weakref.ref(cond_object)) for cond_object in linked_cond_objects)
+			self.entries[limitation.key] = entry
+			for object_id, ref in entry:
+				self.index.setdefault(object_id, set()).add(limitation.key)
+
+			if len(self.entries) > self.limit:
+				key = next(iter(self.entries))
+				self.__unindex(key, self.entries.pop(key))
+
+	def forget(self, cond_object):
+		#drops all nogoods found for the object; objects without nogoods are only looked up
+		if id(cond_object) not in self.index:
+			return
+
+		with self.lock:
+			for key in self.index.pop(id(cond_object), ()):
+				entry = self.entries.pop(key, None)
+				if entry is not None:
+					self.__unindex(key, entry)
+
+	def __unindex(self, key, entry):
+		for object_id, ref in entry:
+			keys = self.index.get(object_id)
+			if keys is not None:
+				keys.discard(key)
+				if not keys:
+					del self.index[object_id]
 
-	n_expression = ""
 
-	for i in range(len(expression)):
-		#remove spaces from expression
-		if expression[i] != " " and expression[i] != "^":
-			n_expression += expression[i]
-		elif expression[i] == "^":
-			n_expression += "**"
+'''
+PRIVATE
+Context manager that holds the locks of the given objects (other values are ignored), of all the LinkedCond objects linked to them, and of
+the Cond objects used as evaluation numbers in their limitations, so that no other thread can change them or their limitations meanwhile
+Locks are always acquired in the order of the serial numbers of the objects, so two threads can never wait for each other; since the linked
+objects can change until all locks are held, they are found again after that, and if there are new ones, all locks are released and
+acquired again, along with the new ones
+Locks are reentrant, so a thread holding the locks of some objects can acquire them again, or acquire the locks of some of them
+'''
+class _Locked:
+
+	def __init__(self, cond_objects):
+		self.cond_objects = cond_objects
+		self.locks = ()
+
+	def __enter__(self):
+		found = _lockClosure(self.cond_objects)
+		while True:
+			locks = sorted((cond_object._getLock() for cond_object in found.values()), key = lambda lock: lock[1])
+			for lock, serial in locks:
+				lock.acquire()
+
+			current = _lockClosure(self.cond_objects)
+			if current.keys() <= found.keys():
+				#objects whose main options are hidden by a deferred() context of another thread can't be changed until that thread runs
+				#its queued calls; threads that already hold locks don't wait for that, so that two threads can never wait for each other
+				if _MainData.thread.depth or not _hiddenElsewhere(found.values()):
+					self.locks = locks
+					_MainData.thread.depth += 1
+					return self
+
+			for lock, serial in reversed(locks):
+				lock.release()
+
+			#a thread never waits for another one while it has queued calls of its own, since the other thread might be waiting for them
+			if current.keys() <= found.keys():
+				if _MainData.thread.pending:
+					_flushDeferred()
+				else:
+					_waitDeferred(found.values())
+			found.update(current)
 
-		#unknown character in expression
-		if expression[i] not in _MainData.accepted_characters:
-			return None
+	def __exit__(self, exc_type, exc_value, traceback):
+		for lock, serial in reversed(self.locks):
+			lock.release()
 
-		#if number is followed by letter or letter is followed by letter, multiplication is implied
-		if i != len(expression) - 1 and ((expression[i].isdigit() and (expression[i + 1].isalpha() or expression[i + 1] == "(")) or (expression[i].isalpha() and (expression[i + 1].isalpha() or expression[i + 1].isdigit() or expression[i + 1] == "("))):
-			n_expression += "*"
+		#observers are called once all locks are released, so they can use any object
+		thread = _MainData.thread
+		thread.depth -= 1
+		if not thread.depth and thread.changes is not None:
+			changes = thread.changes
+			thread.changes = None
+			_notifyChanges(changes)
 
-	if not return_str:
-		formula = expr(n_expression).compile()
-		return formula
+		return False
 
-	return n_expression
 
 '''
 PRIVATE
-recursive function, runs a single test of the equation for all combinations of numbers of all passed Cond objects
-if combination is found, a dictionary is returned containing the Cond objects as keys and the indexes of the new main number as values
-if no combination is found, None is returned
-Arguments:
-formula -> formula in code, executable with eval(), created by _interpretExpression
-variables_to_cond -> dict mapping single-letter variables to the Cond object they represent
-max_recursion_level -> highest level of recursion, essentially is the amount of total Cond objects -1
-recursion_level -> current recursion level, reduced by one every recursive call, until it hits 0
-numbers -> dict mapping the single_letter variables to the value that they will be tested as
-indexes -> dict mapping the Cond object IDs to the index of the current option, so it can be returned if the option combination satisfies the equation
-eval_sign -> the evaluation sign
-eval_num -> the evaluation number(s)
-combination_set -> can be one of two things:
-	* None: if it is None, the first combination found will be returned in form of the indexes dict
-	* set: if it is set, every combination dict found will be converted to tuple, and added to that set
-	all available combinations will be found; the return value will be list of dicts (essentially, _convertToListOfDicts will be called on the set)
+Records a change of the given object for its observers (see Cond.observe()); old_index and old_value are its main option index and main
+option before the change
+While the thread holds locks through _Locked, changes are kept until all of them are released, and only the first old_index and old_value
+of each object are kept; otherwise, the observers are called right away
 '''
-def _findCombination(formula, variables_to_cond, max_recursion_level, recursion_level, numbers, indexes, eval_sign, eval_num, combination_set):
+def _recordChange(cond_object, change, old_index, old_value):
 
-	keys = tuple(variables_to_cond.keys())
-	
-	#get Cond object to run loop for
-	CondObj = variables_to_cond[keys[recursion_level]]
-	for number in CondObj:
+	thread = _MainData.thread
+	if thread.changes is None:
+		changes = {}
+		if thread.depth:
+			thread.changes = changes
+	else:
+		changes = thread.changes
 
-		#if this is the highest recursion level, reset the dictionaries to run again
-		if recursion_level == max_recursion_level:
-			numbers = {}
-			indexes = {}
+	entry = changes.get(id(cond_object))
+	if entry is None:
+		entry = changes[id(cond_object)] = [cond_object, old_index, old_value, set()]
+	if change is not None:
+		entry[3].add(change)
 
-		#map the single-letter variable to the number
-		numbers[keys[recursion_level]] = number
-		#map the Cond object's id to the index of the number in it 
-		#(if Cond object is mapped instead of id, two Cond objects with same main value will be the same entry and overwrite each other)
-		indexes[id(CondObj)] = CondObj.index(number)
+	if not thread.depth:
+		_notifyChanges(changes)
 
-		#if all the for loops have been run
-		if recursion_level == 0:			
 
-			#if combination satisfies equation, return the indexes or add them to given set
-			if _testEquation(formula, numbers, eval_sign, eval_num):
-				if type(combination_set) is set:
-					combination_set.add(tuple(indexes.items()))
-				else:
-					return indexes
+'''
+PRIVATE
+Calls the observers of the objects in changes, a dict whose values are the lists kept by _recordChange(); objects that ended up with the
+same main option, and with no other changes, are skipped
+'''
+def _notifyChanges(changes):
 
-		else:
-			#get the result from deeper recursion level
-			result = _findCombination(formula, variables_to_cond, max_recursion_level, recursion_level - 1, numbers, indexes, eval_sign, eval_num, combination_set)
-			#if the result isn't None, a combination was found and combination set was not None, so return it to higher recursion level or to calling function
-			if result:
-				return result
+	for cond_object, old_index, old_value, flags in changes.values():
+		new_index = cond_object._getmain()
+		new_value = cond_object.all()[new_index]
+		if new_value != old_value or type(new_value) is not type(old_value):
+			flags.add("main")
 
-	#if recursion level is max, it means all calls ended, so return the combination set
-	if recursion_level == max_recursion_level and combination_set:
-		return _convertToListOfDicts(combination_set)
+		observers = cond_object._getObservers()
+		if not flags or observers is None:
+			continue
 
-	#if recursion level isn't max but indexes haven't been returned, return None (either no combination was found, or it was added to set)
-	return None
+		flags = frozenset(flags)
+		for callback in list(observers):
+			callback(cond_object, old_index, new_index, flags)
 
 
 '''
 PRIVATE
-tests if given equation is true
-arguments required come directly from recursion level 0 of _findCombinations
-returns True if given combination satisfies equation, else False
+Returns a dict mapping the IDs of the objects that _Locked needs to lock for the given values to the objects
 '''
-def _testEquation(formula, numbers, eval_sign, eval_num):
-	#set all the values for the single-letter variables
-	for variable in numbers:
-		exec("{} = {}".format(variable, numbers[variable]))
-	#calculate the expression result
-	try:
-		equation_result = eval(formula)
-	#if ZeroDivisionError, then combination of numbers cannot be right
-	except ZeroDivisionError:
-		return None
-	#if the result satisfies all evaluations (with all given eval_nums), return True, else False
-	satisfies = True
-	for num in eval_num:
-		if not _MainData.evaluation_signs[eval_sign](equation_result, num):
-			satisfies = False
-			break
+def _lockClosure(values):
+
+	cond_objects = [value for value in values if type(value) in {Cond, LinkedCond}]
+	found = {id(cond_object): cond_object for cond_object in cond_objects}
+
+	linked_cond_objects, limitations = _linkedClosure([cond_object for cond_object in cond_objects if type(cond_object) is LinkedCond])
+	found.update((id(cond_object), cond_object) for cond_object in linked_cond_objects)
+	for limitation in limitations:
+		found.update((id(num), num) for num in limitation.eval_num if type(num) in {Cond, LinkedCond})
+
+	return found
+
 
-	return satisfies
 '''
 PRIVATE
-returns true if the two passed limitations are equal
+Stores values that are reused by functions so they aren't constantly allocated and freed
 '''
-def _limEquals(lim1, lim2):
-	if lim1[0] != lim2[0]:
-		return False
-
-	if len(lim1[1]) != len(lim2[1]):
-		return False
+class _MainData:
+	evaluation_signs = {"=": operator.eq, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "!=": operator.ne}
+	operation_signs = {"+", "-", "*", "/", "%", "^"}
+	eval_globals = {"__builtins__": {}} #globals used when evaluating formulas, so that no builtins are reachable
+	accepted_characters = set(ascii_uppercase + ascii_lowercase + digits) | operation_signs | {" ", "(", ")"}
+	unary_operations = {ast.UAdd: operator.pos, ast.USub: operator.neg} #operations accepted in expressions, mapped to their functions
+	binary_operations = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow}
+	limitations = weakref.WeakValueDictionary() #maps canonical keys of limitations to their _Limitation records
+	segments = {} #maps names of shared memory segments used by this process to [segment, reference count, created here, pid]
+	byte_orders = {"<": "little", ">": "big", "!": "big"}
+	buffer_formats = "bBhHiIlLqQfd"
+	local_search_noise = 0.2 #probability of require_local() picking a random option instead of the best one
+	local_search_sample = 64 #most options of an object that require_local() compares at each step
+	thread = _ThreadState() #state kept separately by every thread
+	serials = itertools.count() #serial numbers of objects, used to order the acquisition of their locks
+	hiders = {} #maps IDs of objects whose main options are hidden by deferred() to the identifier of the thread that queued the calls
+	deferred_done = threading.Condition() #guards hiders, and is notified when a thread has run its queued calls
+	snapshot_magic = b"CONDSNAP" #first bytes of data created by snapshot()
+	snapshot_version = 1
+	nogoods = _NogoodStore(1024) #limitations known to fail with the limitations of the objects linked to them
 
-	if lim1[2] != lim2[2]:
-		return False
 
-	if len(lim1[3]) != len(lim2[3]):
-		return False
 
-	i = 0
-	while i < len(lim1[1]):
-		if lim1[i] is not lim2[i]:
-			return False
-		i += 1
+def require(expression, cond_objects, eval_sign, eval_num):
 
-	i = 0
-	while i < len(lim1[3]):
-		if lim1[i] != lim2[i]:
-			return False
+	'''
+	require function
+	Used to set limitations for Cond/LinkedCond objects
+	Input arguments:
+	-> expression: a mathematical expression to evaluate; essentially the "left part" of the equation
+	every variable that is part of the expression must be single-letter; it corresponds to exactly one Cond object
+	-> cond_objects: the Cond objects to replace the variables in the expression with; can be tuple of Conds or simply Cond
+	must include exactly the same amount of arguments as variables in the expression
+	LinkedCond and Cond objects cannot be used at the same time (it would link non-LinkedCond objects, which isn't possible)
+	->eval_sign: evaluation sign to be used; must be =, >, >=, <, <=, !=
+	->eval_num: evaluation number to be used; can be any numeric type or Cond, but not expression; 
+	for != sign, multiple eval nums can be passed as a type tuple
+	The require function will go through all combinations for the options of all involved Cond objects and attempt to find
+	a combination, which satisfies the equation; if such options are found, the main option(s) of the Cond object(s) passed
+	will be changed to those new options and True will be returned; otherwise, the Cond objects will not be changed in any way
+	and False will be returned
+	Similarly, for LinkedCond objects, all combinations which satisfy each limitation will be found; then, the "intersection" will
+	be found (meaning a combination to satisfy all limitations); if such a combination exists, the main option(s) of all LinkedCond
+	objects involved will be set to those; NOTE: LinkedCond objects, since they are linked, can be changed indirectly (refer to README)
+	Inside a deferred() context, the arguments are checked, but the call is queued and None is returned (see deferred())
+	'''
+
+	checked = _checkArguments(expression, cond_objects, eval_sign, eval_num)
+
+	if _MainData.thread.contexts:
+		_deferRequest(expression, eval_sign, checked)
+		return None
+	elif _MainData.thread.pending:
+		_flushDeferred()
+
+	return _requireChecked(expression, eval_sign, *checked)
+
+
+'''
+PRIVATE
+Body of require(), called with the arguments returned by _checkArguments()
+'''
+def _requireChecked(expression, eval_sign, cond_objects, condtype, eval_num, parsed, variables_to_cond):
+
+	with _Locked(cond_objects + eval_num):
+		if condtype is Cond:
+			#find the first combination, which is returned as a dict mapping IDs of objects to corresponding indexes
+			result = _findCombination(parsed, variables_to_cond, eval_sign, eval_num)
+
+			#if None was returned, no combination was found
+			if result is None:
+				return False
+
+			#for each Cond object, set their main option to given index
+			for CondObj in cond_objects:
+				CondObj._setmain(result[CondObj.ID])
+
+			return True
+
+		limitation = _getLimitation(expression, cond_objects, eval_sign, eval_num)
+		if _knownInfeasible(limitation):
+			return False
+
+		resulting_combinations, new_results, linked_cond_objects, results = _solveLinked([(parsed, variables_to_cond, eval_sign, eval_num)])
+
+		#if the solution set is empty, no combination was found
+		if not resulting_combinations:
+			_learnInfeasible(limitation, linked_cond_objects, results)
+			return False
+
+		_commitLinked(resulting_combinations, linked_cond_objects, results, [(limitation, new_results[0])])
+		return True
+
+
+'''
+PRIVATE
+returns True if the given limitation is known to have no combination that satisfies it along with the limitations of the objects linked
+to its objects (see _NogoodStore)
+'''
+def _knownInfeasible(limitation):
+	return not limitation.dynamic and _MainData.nogoods.known(limitation)
+
+
+'''
+PRIVATE
+records that the given limitation has no combination that satisfies it along with limitations, the limitations of linked_cond_objects
+Nothing is recorded if any of the limitations depends on the main options of Cond objects used as evaluation numbers
+'''
+def _learnInfeasible(limitation, linked_cond_objects, limitations):
+	if not limitation.dynamic and not any(other.dynamic for other in limitations):
+		_MainData.nogoods.record(limitation, linked_cond_objects)
+
+
+'''
+PRIVATE
+Sets the main options of the given linked objects to the first of the resulting combinations, adds the new limitations (given
+as a list of (limitation, SolutionSet of the combinations satisfying it)) to their objects, and caches the component they now form
+results must hold the results of the limitations the objects already had
+'''
+def _commitLinked(resulting_combinations, linked_cond_objects, results, new_limitations):
+
+	#pick the first combination and set the main options of all linked objects to the corresponding options
+	final_combination = resulting_combinations[0]
+
+	for cond_object in linked_cond_objects:
+		#set new main option for LinkedCond object
+		cond_object._setmain(final_combination[resulting_combinations.position(cond_object)])
+
+	#add limitations to the objects contained in their expressions
+	for limitation, result in new_limitations:
+		for cond_object in limitation.cond_objects:
+			cond_object._addLim(limitation)
+		results[limitation] = result
+
+	#all linked objects are now in one component, whose combinations are the resulting ones
+	component = _Component(resulting_combinations, results, True)
+	for cond_object in linked_cond_objects:
+		cond_object._setComponent(component if component.cacheable else None)
+
+
+def deferred():
+
+	'''
+	deferred function
+	Returns a context manager, inside which require() calls are not run immediately; their arguments are checked, but they are
+	queued and return None, and the main options of the objects they would change are hidden
+	The queued calls are run together once the main option of one of those objects is read (by arithmetic, comparisons, str(), int()
+	and so on), when options of any object are changed, when the limitations of a LinkedCond object are read, or when the context exits
+	After the context exits, the results attribute of the context manager holds the result of each call made inside it, in order
+	Calls on LinkedCond objects that are linked, or become linked by the queued calls, are solved with a single search over all of
+	their limitations; only if it fails are they run one by one, to find out which ones fail
+	Calls on Cond objects are run from the last one to the first, and a call is skipped when all of its objects are set by calls after
+	it, since its result could not be seen; the result of a skipped call is None
+	Calls using Cond objects as evaluation numbers depend on the main options left by the calls before them, so if there are any,
+	all queued calls are run one by one, in order
+	Contexts can be nested; leaving any of them runs all queued calls, unless it is left because of an exception, in which case the calls
+	queued inside it are dropped (their results stay None) and the calls queued in the outer contexts stay queued
+	Contexts and their queued calls belong to the thread that entered them, and are only run by it; until then, other threads reading
+	the hidden main options see the ones from before the queued calls, and other threads changing those objects wait for them to be run
+	A thread that has to wait for another thread's queued calls runs its own queued calls first, so two threads never wait for each other
+	'''
+
+	return _DeferredRequires()
+
+
+'''
+PRIVATE
+Context manager returned by deferred()
+'''
+class _DeferredRequires:
+
+	def __init__(self):
+		self.results = []
+
+	def __enter__(self):
+		_MainData.thread.contexts.append(self)
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		thread = _MainData.thread
+		thread.contexts.remove(self)
+
+		#calls queued in the context are dropped along with the exception raised inside it
+		if exc_type is not None:
+			dropped = [request for request in thread.pending if request[0] is self]
+			thread.pending = [request for request in thread.pending if request[0] is not self]
+			_dropDeferred(dropped)
+		elif thread.pending:
+			_flushDeferred()
+		return False
+
+
+'''
+PRIVATE
+Queues a require() call made inside a deferred() context, and hides the main options of every object it might change
+'''
+def _deferRequest(expression, eval_sign, checked):
+
+	context = _MainData.thread.contexts[-1]
+	cond_objects, condtype = checked[:2]
+
+
+	with _Locked(cond_objects):
+		#LinkedCond objects can be changed indirectly, through the objects linked to them
+		hidden = tuple(_linkedClosure(cond_objects)[0]) if condtype is LinkedCond else cond_objects
+		with _MainData.deferred_done:
+			for cond_object in hidden:
+				_MainData.hiders[id(cond_object)] = threading.get_ident()
+				cond_object._hideMain()
+
+		context.results.append(None)
+		_MainData.thread.pending.append((context, len(context.results) - 1, expression, eval_sign, checked, hidden))
+
+
+'''
+PRIVATE
+Runs the require() calls queued inside deferred() contexts, as described in deferred(), and stores their results in the contexts
+'''
+def _flushDeferred():
+
+	#only the calls queued by the calling thread are run; other threads waiting for their objects are woken up afterwards
+	thread = _MainData.thread
+	pending = thread.pending
+	thread.pending = []
+
+	try:
+		with _Locked(tuple(cond_object for request in pending for cond_object in request[5] + request[4][2])):
+			_runDeferred(pending)
+	finally:
+		_dropDeferred(pending)
+
+
+'''
+PRIVATE
+Called with queued calls that have been run or dropped: shows the main options that they hid again, unless the thread has other queued
+calls hiding them, even if running the calls failed, and wakes up the threads waiting for them
+'''
+def _dropDeferred(pending):
+
+	kept = {id(cond_object) for request in _MainData.thread.pending for cond_object in request[5]}
+	with _MainData.deferred_done:
+		for request in pending:
+			for cond_object in request[5]:
+				if id(cond_object) in kept:
+					continue
+				elif cond_object._isHidden():
+					cond_object._setmain(cond_object._getmain())
+				_MainData.hiders.pop(id(cond_object), None)
+		_MainData.deferred_done.notify_all()
+
+
+'''
+PRIVATE
+Returns True if the main option of any of the given objects is hidden by a deferred() context of another thread
+'''
+def _hiddenElsewhere(cond_objects):
+
+	hiders = _MainData.hiders
+	if not hiders:
+		return False
+
+	ident = threading.get_ident()
+	return any(hiders.get(id(cond_object), ident) != ident for cond_object in cond_objects)
+
+
+'''
+PRIVATE
+Waits until none of the given objects have their main options hidden by a deferred() context of another thread
+'''
+def _waitDeferred(cond_objects):
+
+	with _MainData.deferred_done:
+		while _hiddenElsewhere(cond_objects):
+			_MainData.deferred_done.wait()
+
+
+'''
+PRIVATE
+Body of _flushDeferred(), called with the list of queued calls while holding the locks of their objects
+'''
+def _runDeferred(pending):
+
+	#from now on, reading the main options of the queued objects is allowed again
+	for context, position, expression, eval_sign, checked, hidden in pending:
+		for cond_object in hidden:
+			cond_object._setmain(cond_object._getmain())
+
+	if any(type(num) in {Cond, LinkedCond} for request in pending for num in request[4][2]):
+		for context, position, expression, eval_sign, checked, hidden in pending:
+			context.results[position] = _requireChecked(expression, eval_sign, *checked)
+		return
+
+	#calls on Cond objects, from the last to the first; final_ids holds the objects already set by a later call
+	final_ids = set()
+	for context, position, expression, eval_sign, checked, hidden in reversed(pending):
+		cond_objects, condtype, eval_num, parsed, variables_to_cond = checked
+		if condtype is not Cond or all(id(cond_object) in final_ids for cond_object in cond_objects):
+			continue
+
+		result = _findCombination(parsed, variables_to_cond, eval_sign, eval_num)
+		context.results[position] = result is not None
+		if result is None:
+			continue
+
+		for cond_object in cond_objects:
+			if id(cond_object) not in final_ids:
+				cond_object._setmain(result[cond_object.ID])
+		final_ids.update(id(cond_object) for cond_object in cond_objects)
+
+	#group calls on LinkedCond objects by the objects they link, keeping the original order of the calls in each group
+	groups = []
+	for i, request in enumerate(pending):
+		if request[4][1] is not LinkedCond:
+			continue
+
+		found_ids = {id(cond_object) for cond_object in request[5]}
+		group = [(i, request)]
+		for other in [other for other in groups if not found_ids.isdisjoint(other[0])]:
+			groups.remove(other)
+			found_ids |= other[0]
+			group += other[1]
+		groups.append((found_ids, sorted(group, key = lambda item: item[0])))
+
+	for found_ids, group in groups:
+		limitations = [_getLimitation(expression, checked[0], eval_sign, checked[2]) for i, (context, position, expression, eval_sign, checked, hidden) in group]
+		problems = [(checked[3], checked[4], eval_sign, checked[2]) for i, (context, position, expression, eval_sign, checked, hidden) in group]
+
+		#calls that are known to fail can't be satisfied together with the rest
+		if any(_knownInfeasible(limitation) for limitation in limitations):
+			resulting_combinations = None
+		else:
+			resulting_combinations, new_results, linked_cond_objects, results = _solveLinked(problems)
+
+		#if all calls can't be satisfied together, run them one by one, so that the ones that fail are found
+		if not resulting_combinations:
+			for i, (context, position, expression, eval_sign, checked, hidden) in group:
+				context.results[position] = _requireChecked(expression, eval_sign, *checked)
+			continue
+
+		new_limitations = []
+		for (i, (context, position, expression, eval_sign, checked, hidden)), limitation, result in zip(group, limitations, new_results):
+			new_limitations.append((limitation, result))
+			context.results[position] = True
+
+		_commitLinked(resulting_combinations, linked_cond_objects, results, new_limitations)
+
+
+def require_many(requests, workers = None):
+
+	'''
+	require_many function
+	Runs require() for every tuple (expression, cond_objects, eval_sign, eval_num) in requests, in the given order,
+	and returns a list with the result of each one
+	All requests are checked before any of them is run, and each distinct expression is only interpreted once
+	Requests on Cond objects don't depend on each other (their result only depends on the options of the objects), so they
+	are solved first, grouped by the shape of their expression (the expression with its variables renamed in order of appearance)
+	and their evaluation sign: requests in a group that use the same objects are solved together, by a single pass over the
+	combinations of options, which evaluates the expression once for all their evaluation numbers; their main options are then set
+	in the original order
+	If workers is given, each group is sent as a single task to a pool of that many processes, which only send back the indexes of the
+	options found; the options of objects that have been shared with share() are read by the processes in place, instead of being
+	copied to them, and options that are ranges are sent as range objects
+	Requests on LinkedCond objects, and requests using Cond objects as evaluation numbers, depend on the state left by the requests
+	before them, so they are run one by one, just like require()
+	Inside a deferred() context, every request is queued like a require() call, and a list of None is returned
+	'''
+
+	checked = [_checkArguments(*request) for request in requests]
+
+	if _MainData.thread.contexts:
+		for request, arguments in zip(requests, checked):
+			_deferRequest(request[0], request[2], arguments)
+		return [None] * len(requests)
+	elif _MainData.thread.pending:
+		_flushDeferred()
+
+	with _Locked(tuple(cond_object for request in checked for cond_object in request[0] + request[2])):
+		#group independent requests on Cond objects by their shape and evaluation sign, and inside each group, by their objects,
+		#keeping the positions of the requests
+		groups = {}
+		for i, (cond_objects, condtype, eval_num, parsed, variables_to_cond) in enumerate(checked):
+			if condtype is Cond and not any(type(num) in {Cond, LinkedCond} for num in eval_num):
+				objects = groups.setdefault((parsed.shape, requests[i][2]), {})
+				objects.setdefault(tuple(id(cond_object) for cond_object in cond_objects), []).append(i)
+
+		found = {}
+		if workers is None or not groups:
+			for (shape, eval_sign), objects in groups.items():
+				for positions in objects.values():
+					cond_objects, condtype, eval_num, parsed, variables_to_cond = checked[positions[0]]
+					results = _findCombinations(parsed, variables_to_cond, eval_sign, [checked[i][2] for i in positions])
+					found.update(zip(positions, results))
+		else:
+			with ProcessPoolExecutor(max_workers = workers) as executor:
+				futures = {}
+				for (shape, eval_sign), objects in groups.items():
+					problems = []
+					for positions in objects.values():
+						#the options are in the order of the variables of the shape, since the objects are paired with variables in order of appearance
+						options = [cond_object._getRange() or (cond_object.all() if type(cond_object.all()) is not _BufferOptions else cond_object.all()[:]) for cond_object in checked[positions[0]][0]]
+						problems.append((options, [checked[i][2] for i in positions]))
+					futures[executor.submit(_solveGroup, shape, eval_sign, problems)] = list(objects.values())
+
+				for future in futures:
+					for positions, results in zip(futures[future], future.result()):
+						found.update(zip(positions, results))
+
+		results = []
+		for i, request in enumerate(requests):
+			if i in found:
+				if found[i] is None:
+					results.append(False)
+					continue
+
+				for cond_object, index in zip(checked[i][0], found[i]):
+					cond_object._setmain(index)
+				results.append(True)
+			else:
+				results.append(_requireChecked(request[0], request[2], *checked[i]))
+
+		return results
+
+
+def solutions(expression, cond_objects, eval_sign, eval_num):
+
+	'''
+	solutions function
+	Takes the same arguments as require(), but instead of changing any main options, returns a SolutionSet object
+	containing every combination of options which satisfies the equation
+	For LinkedCond objects, the combinations also satisfy all limitations of the objects linked to them, and the SolutionSet
+	includes a column for every one of these objects
+	No limitations are added to any object
+	'''
+
+	if _MainData.thread.pending:
+		_flushDeferred()
+
+	cond_objects, condtype, eval_num, parsed, variables_to_cond = _checkArguments(expression, cond_objects, eval_sign, eval_num)
+
+	with _Locked(cond_objects + eval_num):
+		if condtype is Cond:
+			return _findCombination(parsed, variables_to_cond, eval_sign, eval_num, SolutionSet(variables_to_cond.values()))
+
+		return _solveLinked([(parsed, variables_to_cond, eval_sign, eval_num)])[0]
+
+
+def count_solutions(expression, cond_objects, eval_sign, eval_num):
+
+	'''
+	count_solutions function
+	Takes the same arguments as require(), but instead of changing any main options, returns the amount of combinations of options
+	which satisfy the equation, without keeping any of them
+	If the expression is a sum of parts that don't share any variables (such as 3x - 2y + z^2), and each part only takes integer values,
+	the values of each part are counted once, and the counts are combined, instead of going through every combination of options
+	For LinkedCond objects, the combinations also satisfy all limitations of the objects linked to them, and the options of every
+	linked object are included, so the result is equal to len(solutions(...)) with the same arguments
+	'''
+
+	if _MainData.thread.pending:
+		_flushDeferred()
+
+	cond_objects, condtype, eval_num, parsed, variables_to_cond = _checkArguments(expression, cond_objects, eval_sign, eval_num)
+
+	with _Locked(cond_objects + eval_num):
+		#Cond objects used as evaluation numbers keep their main options while counting
+		nums = tuple(+num if type(num) in {Cond, LinkedCond} else num for num in eval_num)
+
+		components = {}
+		if condtype is LinkedCond:
+			if _knownInfeasible(_getLimitation(expression, cond_objects, eval_sign, eval_num)):
+				return 0
+
+			for cond_object in cond_objects:
+				component = cond_object._getComponent()
+				if component is not None:
+					components[id(component)] = component
+
+		if components:
+			return _countLinked(parsed.formula, variables_to_cond, eval_sign, nums, list(components.values()))
+
+		count = _countSeparable(parsed.tree, variables_to_cond, eval_sign, nums)
+		if count is None:
+			count = _countCombinations(parsed.formula, variables_to_cond, eval_sign, nums)
+
+		return count
+
+
+def require_best(expression, cond_objects, eval_sign, eval_num, objective, mode = "min"):
+
+	'''
+	require_best function
+	Takes the same arguments as require(), along with objective, an expression using (some of) the variables of expression, and mode,
+	which is "min" or "max"; out of all combinations that satisfy the equation, finds the one for which objective is smallest (for "min")
+	or largest (for "max"), sets the main options to it and returns True; if no combination satisfies the equation, returns False
+	Combinations for which objective can't be evaluated (because of a division by zero) are ignored
+	The search is a branch and bound: after each option is picked, lower and upper bounds of both expressions are estimated, using the
+	smallest and largest options of the objects whose options haven't been picked yet; options that can't satisfy the equation, or
+	can't beat the best combination found so far, are skipped, along with all the combinations that include them
+	Options must be real numbers
+	For LinkedCond objects, the combination must also satisfy the limitations of the objects linked to them, and the limitation is added
+	just like with require(); since not all combinations of the new limitation are found, the cached combinations of the linked objects
+	are found again the next time they are needed
+	'''
+
+	if mode not in {"min", "max"}:
+		raise ValueError("require_best(): mode must be \"min\" or \"max\"")
+
+	if _MainData.thread.pending:
+		_flushDeferred()
+
+	cond_objects, condtype, eval_num, parsed, variables_to_cond = _checkArguments(expression, cond_objects, eval_sign, eval_num)
+
+	if type(objective) is not str:
+		raise TypeError("require_best(): objective must be a string")
+
+	objective_parsed, objective_variables = _interpretShape(objective)
+	if not set(objective_variables) <= set(variables_to_cond):
+		raise ValueError("require_best(): objective uses variables that are not in expression")
+
+	for cond_object in cond_objects:
+		if any(type(option) is complex for option in cond_object.all()):
+			raise TypeError("require_best(): options must be real numbers")
+
+	with _Locked(cond_objects + eval_num):
+		allowed = ()
+		if condtype is LinkedCond:
+			if _knownInfeasible(_getLimitation(expression, cond_objects, eval_sign, eval_num)):
+				return False
+			linked_cond_objects, components, allowed = _projectComponents(variables_to_cond)
+
+		indexes = _searchBest(parsed.formula, objective_parsed.formula, expression, objective, variables_to_cond, eval_sign, eval_num, mode, allowed)
+		if indexes is None:
+			return False
+
+		chosen = {id(cond_object): index for cond_object, index in zip(variables_to_cond.values(), indexes)}
+
+		if condtype is LinkedCond:
+			#objects of each component take their options from a cached combination that agrees with the chosen options
+			for component in components:
+				solution_set = component.solutions
+				common = [(i, chosen[id(cond_object)]) for i, cond_object in enumerate(solution_set.conds()) if id(cond_object) in chosen]
+				for row in solution_set:
+					if all(row[i] == index for i, index in common):
+						break
+
+				for cond_object, index in zip(solution_set.conds(), row):
+					cond_object._setmain(index)
+
+			limitation = _getLimitation(expression, cond_objects, eval_sign, eval_num)
+			for cond_object in cond_objects:
+				cond_object._addLim(limitation)
+
+			for cond_object in linked_cond_objects:
+				cond_object._setComponent(None)
+
+		for cond_object in variables_to_cond.values():
+			cond_object._setmain(chosen[id(cond_object)])
+
+		return True
+
+
+def require_local(expression, cond_objects, eval_sign, eval_num, steps = 10000, restarts = 10, timeout = None, seed = None):
+
+	'''
+	require_local function
+	Takes the same arguments as require(), but instead of going through all combinations, runs a local search, which is useful for
+	many linked objects with many options, when there are too many combinations to go through but satisfying ones are plentiful
+	Starting from the current main options, a limitation that doesn't hold is picked at random, and the option of one of its objects
+	is changed to the one that leaves the fewest limitations of that object broken (or, sometimes, to a random one, to escape from
+	combinations that can't be improved by changing a single option); this is repeated until all limitations hold
+	-> steps: the most changes that are made in total; they are split evenly between restarts
+	-> restarts: the amount of searches; every search after the first starts from random options
+	-> timeout: if given, the most seconds that the search can run for
+	-> seed: seed of the random number generator, so that searches can be repeated
+	If a combination is found, the main options are set to it and True is returned; for LinkedCond objects, the limitations of all linked
+	objects hold, and the limitation is added, just like with require()
+	If no combination is found within the budget, nothing is changed and None is returned; this does NOT mean that no combination exists
+	'''
+
+	if _MainData.thread.pending:
+		_flushDeferred()
+
+	cond_objects, condtype, eval_num, parsed, variables_to_cond = _checkArguments(expression, cond_objects, eval_sign, eval_num)
+
+	if type(steps) is not int or steps < 1:
+		raise ValueError("require_local(): steps must be a positive integer")
+	elif type(restarts) is not int or restarts < 1:
+		raise ValueError("require_local(): restarts must be a positive integer")
+
+	with _Locked(cond_objects + eval_num):
+		limitation = _getLimitation(expression, cond_objects, eval_sign, eval_num)
+
+		if condtype is LinkedCond:
+			#no search can find a combination for a limitation that is known to fail
+			if _knownInfeasible(limitation):
+				return None
+			linked_cond_objects, limitations = _linkedClosure(cond_objects)
+			limitations[limitation] = None
+		else:
+			linked_cond_objects, limitations = list(variables_to_cond.values()), {limitation: None}
+
+		deadline = None if timeout is None else time.monotonic() + timeout
+		found = _localSearch(linked_cond_objects, limitations, random.Random(seed), steps, restarts, deadline)
+		if found is None:
+			return None
+
+		for cond_object in linked_cond_objects:
+			cond_object._setmain(found[id(cond_object)])
+
+		if condtype is LinkedCond:
+			for cond_object in cond_objects:
+				cond_object._addLim(limitation)
+
+			#the combinations of the objects weren't all found, so they are found again the next time they are needed
+			for cond_object in linked_cond_objects:
+				cond_object._setComponent(None)
+
+		return True
+
+
+'''
+PRIVATE
+Used by require_best() for LinkedCond objects: finds the components of the objects in variables_to_cond, and, for each one,
+the combinations of options of the objects in variables_to_cond that it allows
+Returns a tuple of the list of linked objects, the list of components, and a tuple holding, for each component, a tuple of:
+-> the positions, in variables_to_cond, of the variables whose objects belong to the component, in increasing order
+-> a list of sets; the set at i holds the allowed tuples of indexes of the objects at the first i + 1 of these positions
+'''
+def _projectComponents(variables_to_cond):
+
+	linked_cond_objects = []
+	found_ids = set()
+	components = []
+	allowed = []
+
+	for cond_object in variables_to_cond.values():
+		if id(cond_object) in found_ids:
+			continue
+
+		component = cond_object._getComponent()
+		if component is None:
+			found_ids.add(id(cond_object))
+			linked_cond_objects.append(cond_object)
+			continue
+
+		solution_set = component.solutions
+		for linked_cond_object in solution_set.conds():
+			found_ids.add(id(linked_cond_object))
+			linked_cond_objects.append(linked_cond_object)
+		components.append(component)
+
+		positions = tuple(i for i, other in enumerate(variables_to_cond.values()) if solution_set.position(other) is not None)
+		columns = [solution_set.position(other) for other in variables_to_cond.values() if solution_set.position(other) is not None]
+		prefixes = [set() for column in columns]
+		for row in solution_set:
+			projection = tuple(row[column] for column in columns)
+			for i in range(len(columns)):
+				prefixes[i].add(projection[:i + 1])
+
+		allowed.append((positions, prefixes))
+
+	return linked_cond_objects, components, tuple(allowed)
+
+
+def snapshot(cond_objects):
+
+	'''
+	snapshot function
+	Returns a bytes object holding the given Cond/LinkedCond objects (a tuple of them, or a single one), along with all objects linked to
+	them and all objects used as evaluation numbers in their limitations; restore() creates all of them again from it
+	For every object, its options, main option, name and limitations are stored, along with the cached combinations of linked objects,
+	so that restored objects don't have to solve their limitations again
+	Options are stored as 64-bit integers or floats (complex options as pairs of floats), so integer options must fit in 64 bits;
+	memory-mapped and shared options are stored like any other options
+	'''
+
+	if _MainData.thread.pending:
+		_flushDeferred()
+
+	if type(cond_objects) in {Cond, LinkedCond}:
+		cond_objects = (cond_objects,)
+	elif type(cond_objects) is not tuple or any(type(cond_object) not in {Cond, LinkedCond} for cond_object in cond_objects):
+		raise TypeError("snapshot(): bad cond_objects argument")
+
+	#the objects might be linked to new ones until their locks are held
+	while True:
+		found = _snapshotClosure(cond_objects)
+		with _Locked(tuple(found.values())):
+			if _snapshotClosure(cond_objects).keys() != found.keys():
+				continue
+
+			try:
+				return _writeSnapshot(cond_objects, list(found.values()))
+			except (struct.error, OverflowError):
+				raise ValueError("snapshot(): numbers must fit in 64-bit integers") from None
+
+
+def restore(data):
+
+	'''
+	restore function
+	Creates again the objects stored in data by snapshot(), and returns a tuple of the objects that were passed to it, in the same order
+	The objects linked to them are created too, and are linked to them just like before
+	Restored objects keep their names
+	'''
+
+	try:
+		return _readSnapshot(_SnapshotReader(data))
+	except (struct.error, IndexError, UnicodeDecodeError):
+		raise ValueError("restore(): data is not a valid snapshot") from None
+
+
+'''
+PRIVATE
+Returns a dict mapping the IDs of all the objects that snapshot() has to store for the given ones to the objects
+'''
+def _snapshotClosure(cond_objects):
+
+	found = {id(cond_object): cond_object for cond_object in cond_objects}
+	while True:
+		new = _lockClosure(tuple(found.values()))
+		if new.keys() <= found.keys():
+			return found
+		found.update(new)
+
+
+'''
+PRIVATE
+Body of snapshot(); objects holds all the objects to store, and cond_objects the ones whose positions are stored, so restore() can return them
+The format is (all numbers little-endian):
+-> magic bytes and version
+-> the objects: type, main option index, name, range of options (see Cond._getRange()) and options
+-> the limitations: expression, evaluation sign, indexes of their objects and evaluation numbers (which can refer to objects by index)
+-> the cached components of linked objects: the combinations that satisfy all their limitations, and those that satisfy each one
+-> the indexes of cond_objects
+'''
+def _writeSnapshot(cond_objects, objects):
+
+	positions = {id(cond_object): i for i, cond_object in enumerate(objects)}
+	parts = [_MainData.snapshot_magic, struct.pack("<HQ", _MainData.snapshot_version, len(objects))]
+
+	for cond_object in objects:
+		options = cond_object.all()
+		options_range = cond_object._getRange()
+
+		parts.append(struct.pack("<BQ", type(cond_object) is LinkedCond, cond_object._getmain()))
+		parts.append(_packString(cond_object.getname()))
+		parts.append(struct.pack("<B", options_range is not None))
+		if options_range is not None:
+			parts.append(struct.pack("<qqq", options_range.start, options_range.stop, options_range.step))
+
+		if type(options) is array:
+			kind, typecode, values = 3, options.typecode, options
+		elif type(options[0]) is complex:
+			kind, typecode, values = 2, "d", array("d", [part for option in options for part in (option.real, option.imag)])
+		elif type(options[0]) is float:
+			kind, typecode, values = 1, "d", array("d", options)
+		else:
+			kind, typecode, values = 0, "q", array("q", options)
+
+		parts.append(struct.pack("<BcQ", kind, typecode.encode(), len(values)))
+		parts.append(_arrayBytes(values))
+
+	limitations = {}
+	for cond_object in objects:
+		if type(cond_object) is LinkedCond:
+			limitations.update(dict.fromkeys(cond_object._getLimsRepr()))
+	limitation_positions = {limitation: i for i, limitation in enumerate(limitations)}
+
+	parts.append(struct.pack("<Q", len(limitations)))
+	for limitation in limitations:
+		parts.append(_packString(limitation.expression))
+		parts.append(_packString(limitation.eval_sign))
+		parts.append(struct.pack("<H{}Q".format(len(limitation.cond_objects)), len(limitation.cond_objects), *(positions[id(cond_object)] for cond_object in limitation.cond_objects)))
+		parts.append(struct.pack("<H", len(limitation.eval_num)))
+		for num in limitation.eval_num:
+			if type(num) in {Cond, LinkedCond}:
+				parts.append(struct.pack("<BQ", 3, positions[id(num)]))
+			elif type(num) is complex:
+				parts.append(struct.pack("<Bdd", 2, num.real, num.imag))
+			elif type(num) is float:
+				parts.append(struct.pack("<Bd", 1, num))
+			else:
+				parts.append(struct.pack("<Bq", 0, num))
+
+	components = {}
+	for cond_object in objects:
+		if type(cond_object) is LinkedCond and cond_object._getLimsRepr():
+			component = cond_object._getComponent()
+			if component.cacheable:
+				components[id(component)] = component
+
+	parts.append(struct.pack("<Q", len(components)))
+	for component in components.values():
+		parts.append(struct.pack("<BH", component.consistent, len(component.results)))
+		parts.append(_packSolutions(component.solutions, positions))
+		for limitation, result in component.results.items():
+			parts.append(struct.pack("<Q", limitation_positions[limitation]))
+			parts.append(_packSolutions(result, positions))
+
+	parts.append(struct.pack("<Q{}Q".format(len(cond_objects)), len(cond_objects), *(positions[id(cond_object)] for cond_object in cond_objects)))
+	return b"".join(parts)
+
+
+'''
+PRIVATE
+Body of restore()
+'''
+def _readSnapshot(reader):
+
+	if reader.read(len(_MainData.snapshot_magic)) != _MainData.snapshot_magic:
+		raise ValueError("restore(): data is not a valid snapshot")
+
+	version, object_amount = reader.unpack("<HQ")
+	if version != _MainData.snapshot_version:
+		raise ValueError("restore(): unsupported snapshot version {}".format(version))
+
+	objects = []
+	for i in range(object_amount):
+		linked, mainpos = reader.unpack("<BQ")
+		name = reader.string()
+		options_range = range(*reader.unpack("<qqq")) if reader.unpack("<B")[0] else None
+		kind, typecode, length = reader.unpack("<BcQ")
+		values = reader.array(typecode.decode(), length)
+
+		if kind == 3:
+			vals = values
+		elif kind == 2:
+			vals = [complex(values[j], values[j + 1]) for j in range(0, len(values), 2)]
+		else:
+			vals = values.tolist()
+
+		cls = LinkedCond if linked else Cond
+		objects.append(cls._restore(vals, type(vals[0]), mainpos, name, options_range))
+
+	limitations = []
+	for i in range(reader.unpack("<Q")[0]):
+		expression = reader.string()
+		eval_sign = reader.string()
+		cond_amount = reader.unpack("<H")[0]
+		cond_objects = tuple(objects[j] for j in reader.unpack("<{}Q".format(cond_amount)))
+
+		eval_num = []
+		for j in range(reader.unpack("<H")[0]):
+			tag = reader.unpack("<B")[0]
+			if tag == 3:
+				eval_num.append(objects[reader.unpack("<Q")[0]])
+			elif tag == 2:
+				eval_num.append(complex(*reader.unpack("<dd")))
+			else:
+				eval_num.append(reader.unpack("<d" if tag == 1 else "<q")[0])
+
+		limitation = _getLimitation(expression, cond_objects, eval_sign, tuple(eval_num))
+		for cond_object in cond_objects:
+			cond_object._addLim(limitation)
+		limitations.append(limitation)
+
+	for i in range(reader.unpack("<Q")[0]):
+		consistent, result_amount = reader.unpack("<BH")
+		solutions = _unpackSolutions(reader, objects)
+		results = {}
+		for j in range(result_amount):
+			limitation = limitations[reader.unpack("<Q")[0]]
+			results[limitation] = _unpackSolutions(reader, objects)
+
+		component = _Component(solutions, results, bool(consistent))
+		for cond_object in solutions.conds():
+			cond_object._setComponent(component)
+
+	returned = reader.unpack("<Q")[0]
+	return tuple(objects[i] for i in reader.unpack("<{}Q".format(returned)))
+
+
+'''
+PRIVATE
+Reads the data of a snapshot in order
+'''
+class _SnapshotReader:
+
+	def __init__(self, data):
+		self.data = memoryview(data).cast("B")
+		self.offset = 0
+
+	def read(self, size):
+		if self.offset + size > len(self.data):
+			raise IndexError("snapshot data ended")
+
+		chunk = self.data[self.offset:self.offset + size]
+		self.offset += size
+		return bytes(chunk)
+
+	def unpack(self, fmt):
+		return struct.unpack(fmt, self.read(struct.calcsize(fmt)))
+
+	def string(self):
+		length = self.unpack("<I")[0]
+		return None if length == 0 else self.read(length - 1).decode()
+
+	def array(self, typecode, length):
+		values = array(typecode)
+		values.frombytes(self.read(length * values.itemsize))
+		if sys.byteorder == "big":
+			values.byteswap()
+		return values
+
+
+'''
+PRIVATE
+returns the bytes of the given array, in little-endian order
+'''
+def _arrayBytes(values):
+	if sys.byteorder == "big":
+		values = array(values.typecode, values)
+		values.byteswap()
+	return values.tobytes()
+
+
+'''
+PRIVATE
+returns the bytes of the given string (or None) as stored in snapshots: its length plus one (0 for None), followed by its UTF-8 bytes
+'''
+def _packString(string):
+	if string is None:
+		return struct.pack("<I", 0)
+
+	data = string.encode()
+	return struct.pack("<I", len(data) + 1) + data
+
+
+'''
+PRIVATE
+returns the bytes of the given SolutionSet as stored in snapshots: the indexes of its objects in positions, the amount of combinations
+and its columns
+'''
+def _packSolutions(solution_set, positions):
+	conds = solution_set.conds()
+	parts = [struct.pack("<H{}QQ".format(len(conds)), len(conds), *(positions[id(cond_object)] for cond_object in conds), len(solution_set))]
+	parts.extend(_arrayBytes(array("q", solution_set.column(cond_object))) for cond_object in conds)
+	return b"".join(parts)
+
+
+'''
+PRIVATE
+reads a SolutionSet stored by _packSolutions(), whose objects are in objects
+'''
+def _unpackSolutions(reader, objects):
+	cond_amount = reader.unpack("<H")[0]
+	conds = tuple(objects[i] for i in reader.unpack("<{}Q".format(cond_amount)))
+	length = reader.unpack("<Q")[0]
+	return SolutionSet._restore(conds, [reader.array("q", length) for cond_object in conds])
+
+
+'''
+PRIVATE
+Checks the arguments passed to require() and the functions sharing its signature, raising the appropriate error if they are wrong
+Returns a tuple of:
+-> cond_objects, always as a tuple
+-> the type of the objects (Cond or LinkedCond)
+-> eval_num, always as a tuple
+-> the _Expression of the expression, given by _parseExpression()
+-> the dict mapping single-letter variables to the corresponding Cond objects
+'''
+def _checkArguments(expression, cond_objects, eval_sign, eval_num):
+
+	#if evaluation sign is unknown
+	if eval_sign not in _MainData.evaluation_signs.keys():
+		raise ValueError("require(): bad evaluation sign")
+	#if evaluation number is of incorrect type
+	elif type(eval_num) not in {Cond, LinkedCond, int, float, complex, tuple}:
+		raise TypeError("require(): bad evaluation number")
+	#if cond_objects is of incorrect type
+	elif type(cond_objects) not in {tuple, Cond, LinkedCond}:
+		raise TypeError("require(): bad cond_objects argument")
+
+	if type(cond_objects) in {Cond, LinkedCond}:
+		condtype = type(cond_objects)
+		cond_objects = (cond_objects,)
+	else:
+		condtype = type(cond_objects[0])
+		for cond_object in cond_objects:
+			if type(cond_object) not in {Cond, LinkedCond}:
+				raise TypeError("require(): bad cond_objects argument")
+			elif type(cond_object) is not condtype:
+				raise TypeError("require(): cannot evaluate expression with both Cond and LinkedCond objects")
+
+	if type(eval_num) is not tuple:
+		eval_num = (eval_num,)
+
+	if len(eval_num) != 1 and eval_sign != "!=":
+		raise ValueError("require(): expected single eval_num, but got multiple")
+
+	#interpret expression given by user, and find the variables in it
+	parsed, variables = _interpretShape(expression)
+
+	#if number of variables is different than number of Cond objects, throw error
+	if len(variables) != len(cond_objects):
+		raise ValueError("require(): number of Cond objects passed was different than number of individual variables in expression")
+
+	#map single-letter variables to corresponding Cond objects
+	variables_to_cond = dict(zip(variables, cond_objects))
+
+	return cond_objects, condtype, eval_num, parsed, variables_to_cond
+
+
+'''
+PRIVATE
+Interprets the given expression, returning a tuple of its _Expression, given by _parseExpression(), and the tuple of the
+single-letter variables in it, in order of appearance
+'''
+def _interpretShape(expression):
+
+	parsed = _parseExpression(expression) if type(expression) is str else None
+
+	#if expression was wrong
+	if parsed is None:
+		raise ValueError("require(): bad expression")
+
+	return parsed, parsed.variables
+
+
+'''
+PRIVATE
+Finds all combinations that satisfy the given equations, given as a list of (_Expression, variables_to_cond, eval_sign, eval_num), along with
+all limitations of the LinkedCond objects linked to the objects in them; the cached _Component of each linked group of objects is used,
+so existing limitations aren't solved again
+Returns a tuple of:
+-> the resulting SolutionSet (empty if no combination was found)
+-> the list of SolutionSets of each given equation by itself
+-> the list of linked objects
+-> dict mapping the limitations of the linked objects to their SolutionSet
+'''
+def _solveLinked(problems):
+
+	linked_cond_objects = []
+	found_ids = set()
+	results = {}
+	components = []
+
+	#get the component of every given object, along with every object that's linked to it
+	for parsed, variables_to_cond, eval_sign, eval_num in problems:
+		for cond_object in variables_to_cond.values():
+			if id(cond_object) in found_ids:
+				continue
+
+			component = cond_object._getComponent()
+			if component is None:
+				found_ids.add(id(cond_object))
+				linked_cond_objects.append(cond_object)
+				continue
+
+			for linked_cond_object in component.solutions.conds():
+				found_ids.add(id(linked_cond_object))
+				linked_cond_objects.append(linked_cond_object)
+
+			results.update(component.results)
+			components.append(component)
+
+	#get results of new equations given by user
+	new_results = []
+	for parsed, variables_to_cond, eval_sign, eval_num in problems:
+		new_results.append(_findCombination(parsed, variables_to_cond, eval_sign, eval_num, SolutionSet(variables_to_cond.values())))
+
+	#keep only results that satisfy all new equations, and the limitations of each component too
+	remaining = new_results[1:] + [component.solutions for component in components]
+	resulting_combinations = new_results[0]
+
+	while remaining and resulting_combinations:
+		#join sets that share an object with the joined ones first, so that no cross products of unrelated combinations are created
+		for i, solution_set in enumerate(remaining):
+			if any(resulting_combinations.position(cond_object) is not None for cond_object in solution_set.conds()):
+				break
+		else:
+			i = 0
+
+		resulting_combinations = _joinSolutions(resulting_combinations, remaining.pop(i))
+
+	return resulting_combinations, new_results, linked_cond_objects, results
+
+
+'''
+PRIVATE
+Returns a tuple of the list of all LinkedCond objects linked to the given ones, directly or through other objects (including the
+given ones), and a dict whose keys are all of their limitations (used as an ordered set)
+'''
+def _linkedClosure(cond_objects):
+
+	linked_cond_objects = list(cond_objects)
+	found_ids = {id(cond_object) for cond_object in cond_objects}
+	limitations = {}
+
+	i = 0
+	while i < len(linked_cond_objects):
+		for limitation in linked_cond_objects[i]._getLimsRepr():
+			if limitation in limitations:
+				continue
+
+			limitations[limitation] = None
+			for linked_cond_object in limitation.cond_objects:
+				if id(linked_cond_object) not in found_ids:
+					found_ids.add(id(linked_cond_object))
+					linked_cond_objects.append(linked_cond_object)
 		i += 1
 
+	return linked_cond_objects, limitations
+
+
+'''
+PRIVATE
+Group of linked LinkedCond objects, shared by all of them, which caches:
+-> solutions: SolutionSet of the combinations that satisfy all limitations of the group, with a column for every object
+-> results: dict mapping each limitation to the SolutionSet of the combinations that satisfy it by itself
+-> consistent: whether the main options of the objects satisfy all limitations
+When the options of an object change, update() evaluates the affected limitations only for the combinations that include the
+affected option, and updates the cached sets in place
+'''
+class _Component:
+
+	__slots__ = ("solutions", "results", "consistent", "cacheable")
+
+	def __init__(self, solutions, results, consistent):
+		#solutions is updated separately from the results, so it can't be one of them
+		if any(solutions is result for result in results.values()):
+			solutions = solutions._copy()
+
+		self.solutions = solutions
+		self.results = results
+		self.consistent = consistent
+		self.cacheable = not any(limitation.dynamic for limitation in results)
+
+	@classmethod
+	def solve(cls, limitations):
+		#solves every limitation and joins the results; main options are checked directly, since they aren't changed
+		results = {}
+		solutions = None
+		for limitation in _joinOrder(limitations):
+			results[limitation] = limitation.solve()
+			solutions = results[limitation] if solutions is None else _joinSolutions(solutions, results[limitation])
+
+		return cls(solutions, results, all(limitation.holds() for limitation in limitations))
+
+	def update(self, cond_object, action, index):
+		if action in {"remove", "set"}:
+			shift = action == "remove"
+			self.solutions._dropOption(cond_object, index, shift)
+			for limitation in self.results:
+				if self.results[limitation].position(cond_object) is not None:
+					self.results[limitation]._dropOption(cond_object, index, shift)
+
+		if action in {"append", "set"}:
+			#solve the limitations of the object only for the new option, and join them with the results of the rest
+			restricted = {}
+			for limitation in self.results:
+				if self.results[limitation].position(cond_object) is not None:
+					restricted[limitation] = limitation.solve(cond_object, index)
+					self.results[limitation]._extend(restricted[limitation])
+
+			new_combinations = None
+			for limitation in _joinOrder(self.results, restricted):
+				result = restricted.get(limitation, self.results[limitation])
+				new_combinations = result if new_combinations is None else _joinSolutions(new_combinations, result)
+				if not new_combinations:
+					break
+
+			if new_combinations:
+				self.solutions._extend(new_combinations)
+
+		#only changing the main option can change whether the main options satisfy the limitations
+		if action == "set" and cond_object._getmain() == index:
+			self.consistent = all(limitation.holds() for limitation in self.results)
+
+
+'''
+PRIVATE
+Returns the given limitations in an order in which every limitation after the first shares an object with one before it,
+when that is possible, so that joining their results in that order doesn't create cross products of unrelated combinations
+If first is given, its limitations are placed first
+'''
+def _joinOrder(limitations, first = ()):
+
+	ordered = list(first)
+	remaining = [limitation for limitation in limitations if limitation not in first]
+	found_ids = {id(cond_object) for limitation in ordered for cond_object in limitation.cond_objects}
+
+	while remaining:
+		for i, limitation in enumerate(remaining):
+			if not found_ids or any(id(cond_object) in found_ids for cond_object in limitation.cond_objects):
+				break
+		else:
+			i = 0
+
+		limitation = remaining.pop(i)
+		ordered.append(limitation)
+		found_ids.update(id(cond_object) for cond_object in limitation.cond_objects)
+
+	return ordered
+
+
+'''
+PRIVATE
+Joins two SolutionSet objects, keeping only the combinations in which all Cond objects common to both sets have the same options
+Returns new SolutionSet, whose columns are the columns of set1, followed by the columns of set2 that set1 does not have
+Works as a hash join: the combinations of set2 are indexed by the options of the common objects, so every combination of set1
+is only matched against the ones that agree with it; if both sets have unique combinations, so does the result
+'''
+def _joinSolutions(set1, set2):
+
+	conds1 = set1.conds()
+	conds2 = set2.conds()
+	common = [i for i in range(len(conds2)) if set1.position(conds2[i]) is not None]
+	extra = [i for i in range(len(conds2)) if set1.position(conds2[i]) is None]
+	common_positions = [set1.position(conds2[i]) for i in common]
+
+	joined = SolutionSet(conds1 + tuple(conds2[i] for i in extra))
+
+	#index combinations of set2 by the options of the common objects
+	matches = {}
+	for row in set2:
+		key = tuple(row[i] for i in common)
+		extra_options = tuple(row[i] for i in extra)
+		if key in matches:
+			matches[key].append(extra_options)
+		else:
+			matches[key] = [extra_options]
+
+	for row in set1:
+		key = tuple(row[i] for i in common_positions)
+		if key in matches:
+			for extra_options in matches[key]:
+				joined._addRow(row + extra_options)
+
+	return joined
+
+
+'''
+PRIVATE
+Accepts given expression and given cond_objects as arguments
+Maps each individual single-letter variable to a given cond object
+Returns dictionary with keys mapped to values
+'''
+def _mapVariablesToCond(expression, cond_objects):
+
+	variables_to_cond = {}
+	i = 0
+	for c in expression:
+		if c.isalpha() and c not in variables_to_cond.keys():
+			variables_to_cond[c] = cond_objects[i]
+			i += 1
+
+	return variables_to_cond
+
+
+'''
+PRIVATE
+Renders the expression and evaluation sign of a limitation, as the start of the string returned by LinkedCond.getlims()
+If all the objects in the expression have names, the single-letter variables are replaced by them; otherwise, they are kept
+'''
+def _renderLimitation(expression, cond_objects, eval_sign):
+
+	expression = _interpretExpression(expression, len(cond_objects), return_str = True)
+	variables_to_names = {var: cond_object.getname() for var, cond_object in _mapVariablesToCond(expression, cond_objects).items()}
+
+	if None not in variables_to_names.values():
+		expression = "".join(variables_to_names[c] if c.isalpha() else c for c in expression)
+
+	return "{} {} ".format(expression, eval_sign)
+
+
+'''
+PRIVATE
+Parsed form of an expression given to require(), created once for each expression string by _parseExpression()
+text -> the expression in Python syntax, without spaces and with every multiplication written out; used as the canonical form of the
+expression (for example, in the keys of limitations and in the text returned by LinkedCond.getlims())
+tree -> the ast node of the expression, after constant folding
+formula -> code object of the expression, executable with eval(); repeated subexpressions are only computed once
+variables -> tuple of the single-letter variables in the expression, in order of appearance
+shape -> the text with the variables renamed to a, b, c... in order of appearance, so that expressions that only differ in the letters of
+their variables have the same shape; used by require_many() to group requests
+form -> the linear form of the expression (see _linearTerms()), or None if it isn't linear
+'''
+class _Expression:
+
+	__slots__ = ("text", "tree", "formula", "variables", "shape", "form")
+
+	def __init__(self, text, tree, formula, variables, form):
+		self.text = text
+		self.tree = tree
+		self.formula = formula
+		self.variables = variables
+		names = dict(zip(variables, ascii_lowercase + ascii_uppercase))
+		self.shape = "".join(names.get(c, c) for c in text)
+		self.form = form
+
+
+'''
+PRIVATE
+Parses the given expression, returning its _Expression, or None if it isn't a valid expression
+Results are cached for each expression string, so repeated calls with the same expression cost a single lookup
+The expression is split into tokens, implied multiplications are written out and "^" is replaced by "**"; the result is parsed with
+ast.parse() (which never runs any code), and only numbers, single-letter variables and arithmetic operations are accepted in the tree
+'''
+@functools.lru_cache(maxsize = 4096)
+def _parseExpression(expression):
+
+	tokens = _tokenizeExpression(expression)
+	if tokens is None:
+		return None
+
+	text = "".join(tokens)
+	try:
+		tree = ast.parse(text, mode = "eval")
+	except (SyntaxError, RecursionError):
+		return None
+
+	if not _validExpression(tree.body):
+		return None
+
+	folded = _foldConstants(tree.body)
+	#shared subexpressions are bound to temporary names with assignment expressions, which need Python 3.8
+	counts = {}
+	_countSubexpressions(folded, counts)
+	shared = _shareSubexpressions(folded, counts, {}) if any(count > 1 for count in counts.values()) else folded
+
+	formula = compile(ast.fix_missing_locations(ast.Expression(shared)), "<expression>", "eval")
+	variables = tuple(dict.fromkeys(token for token in tokens if token.isalpha()))
+
+	#the linear form, if there is one, is kept with the expression, so that _findCombination() can solve it directly
+	return _Expression(text, folded, formula, variables, _linearTerms(folded))
+
+
+'''
+PRIVATE
+Splits the given expression into a list of tokens (numbers, single-letter variables, operation signs and parentheses), writing out
+implied multiplications, which are implied between a number, variable or closing parenthesis and a following variable or opening
+parenthesis, and between a variable or closing parenthesis and a following number
+Returns None if the expression has characters that are not accepted, or two numbers that are only separated by spaces
+'''
+def _tokenizeExpression(expression):
+
+	tokens = []
+	i = 0
+	while i < len(expression):
+		c = expression[i]
+		if c not in _MainData.accepted_characters:
+			return None
+		elif c == " ":
+			i += 1
+			continue
+
+		if c.isdigit():
+			end = i
+			while end < len(expression) and expression[end].isdigit():
+				end += 1
+			token = expression[i:end]
+			i = end
+		else:
+			token = "**" if c == "^" else c
+			i += 1
+
+		if tokens:
+			last = tokens[-1]
+			if last.isdigit() and token.isdigit():
+				return None
+			elif (last.isalnum() or last == ")") and (token.isalpha() or token == "(" or (token.isdigit() and not last.isdigit())):
+				tokens.append("*")
+
+		tokens.append(token)
+
+	return tokens
+
+
+'''
+PRIVATE
+returns True if the given ast node only holds integer numbers, variables and arithmetic operations, else False
+'''
+def _validExpression(node):
+
+	if type(node) is ast.Constant:
+		return type(node.value) is int
+	elif type(node) is ast.Name:
+		return len(node.id) == 1
+	elif type(node) is ast.UnaryOp:
+		return type(node.op) in _MainData.unary_operations and _validExpression(node.operand)
+	elif type(node) is ast.BinOp:
+		return type(node.op) in _MainData.binary_operations and _validExpression(node.left) and _validExpression(node.right)
+
+	return False
+
+
+'''
+PRIVATE
+returns a copy of the given ast node, where operations on numbers are replaced by their results
+Operations that fail (such as divisions by zero) are kept, so that they fail when the expression is evaluated, and powers are only
+computed if their result is small enough
+'''
+def _foldConstants(node):
+
+	if type(node) is ast.UnaryOp:
+		operand = _foldConstants(node.operand)
+		if type(operand) is ast.Constant:
+			return ast.Constant(-operand.value if type(node.op) is ast.USub else operand.value)
+		return ast.UnaryOp(node.op, operand)
+
+	elif type(node) is not ast.BinOp:
+		return node
+
+	left = _foldConstants(node.left)
+	right = _foldConstants(node.right)
+	if type(left) is ast.Constant and type(right) is ast.Constant:
+		base, exponent = left.value, right.value
+		if type(node.op) is not ast.Pow or abs(exponent) <= 64 and (type(base) is not int or abs(base).bit_length() * abs(exponent) <= 4096):
+			try:
+				return ast.Constant(_MainData.binary_operations[type(node.op)](left.value, right.value))
+			except (ArithmeticError, ValueError):
+				pass
+
+	return ast.BinOp(left, node.op, right)
+
+
+'''
+PRIVATE
+counts the occurrences of every operation in the given ast node, adding them to counts, which maps the dumps of the nodes to their counts
+'''
+def _countSubexpressions(node, counts):
+
+	if type(node) is ast.UnaryOp:
+		_countSubexpressions(node.operand, counts)
+	elif type(node) is ast.BinOp:
+		_countSubexpressions(node.left, counts)
+		_countSubexpressions(node.right, counts)
+	else:
+		return
+
+	key = ast.dump(node)
+	counts[key] = counts.get(key, 0) + 1
+
+
+'''
+PRIVATE
+returns a copy of the given ast node, where the first occurrence of every operation that occurs more than once (according to counts)
+is bound to a temporary name, and the rest are replaced by that name; names maps the dumps of the nodes to the names given so far
+Operands are evaluated from left to right, so the first occurrence is always computed before the rest
+'''
+def _shareSubexpressions(node, counts, names):
+
+	if type(node) not in {ast.UnaryOp, ast.BinOp}:
+		return node
+
+	key = ast.dump(node)
+	if key in names:
+		return ast.Name(names[key], ast.Load())
+
+	if type(node) is ast.UnaryOp:
+		shared = ast.UnaryOp(node.op, _shareSubexpressions(node.operand, counts, names))
+	else:
+		shared = ast.BinOp(_shareSubexpressions(node.left, counts, names), node.op, _shareSubexpressions(node.right, counts, names))
+
+	if counts[key] > 1:
+		#temporary names start with an underscore, so they can never be single-letter variables
+		names[key] = "_{}".format(len(names))
+		return ast.NamedExpr(ast.Name(names[key], ast.Store()), shared)
+
+	return shared
+
+
+'''
+PRIVATE
+returns the formula of the given expression, as created by _parseExpression(), or its text if return_str is True
+returns None if the expression is wrong
+'''
+def _interpretExpression(expression, cond_obj_amount, return_str = False):
+
+	if type(expression) is not str:
+		return None
+
+	parsed = _parseExpression(expression)
+	if parsed is None:
+		return None
+
+	return parsed.text if return_str else parsed.formula
+
+'''
+PRIVATE
+runs a single test of the equation for all combinations of numbers of all passed Cond objects
+Arguments:
+parsed -> the _Expression of the expression, given by _parseExpression()
+variables_to_cond -> dict mapping single-letter variables to the Cond object they represent
+eval_sign -> the evaluation sign
+eval_num -> the evaluation number(s)
+solution_set -> can be one of two things:
+	* None: the first combination found will be returned as a dict mapping the Cond object IDs to the indexes of the options;
+	if no combination is found, None is returned
+	* SolutionSet: its columns must be the Cond objects in variables_to_cond, in the same order; every combination found will be
+	added to it, and it will be returned
+'''
+def _findCombination(parsed, variables_to_cond, eval_sign, eval_num, solution_set = None):
+
+	#linear expressions over ranges of integers are solved directly
+	if parsed.form is not None:
+		result = _findLinear(parsed.form, variables_to_cond, eval_sign, eval_num, solution_set)
+		if result is not NotImplemented:
+			if solution_set is None and result is not None:
+				return {cond_object.ID: index for cond_object, index in zip(variables_to_cond.values(), result)}
+			return result
+
+	formula = parsed.formula
+
+	if solution_set is None:
+		indexes = _searchCombinations(variables_to_cond, lambda numbers, indexes: _testEquation(formula, numbers, eval_sign, eval_num))
+		if indexes is None:
+			return None
+
+		return {cond_object.ID: index for cond_object, index in zip(variables_to_cond.values(), indexes)}
+
+	def visit(numbers, indexes):
+		if _testEquation(formula, numbers, eval_sign, eval_num):
+			solution_set._addRow(indexes)
+
+	_searchCombinations(variables_to_cond, visit)
+	return solution_set
+
+
+'''
+PRIVATE
+Used by _findCombination() and _findCombinations() for linear expressions over Cond objects whose options are ranges of integers
+(see Cond._getRange()), or over range objects
+The options of the first variable, which changes fastest, are not gone through one by one: for each combination of the options of the
+other variables, the indexes of its options that satisfy the equation are found directly by _linearIndexes(), so a search over
+n variables with k options each takes k ** (n - 1) steps instead of k ** n
+Combinations are found in the same order as _searchCombinations() would find them; if solution_set is None, the tuple of the indexes of
+the first combination (in the order of variables_to_cond) is returned, or None if there is none, otherwise solution_set is returned
+Returns NotImplemented if the equation can't be solved this way
+'''
+def _findLinear(form, variables_to_cond, eval_sign, eval_num, solution_set):
+
+	keys = tuple(variables_to_cond.keys())
+	ranges = []
+	for var in keys:
+		options = variables_to_cond[var]
+		if type(options) in {Cond, LinkedCond}:
+			options = options._getRange()
+		if type(options) is not range:
+			return NotImplemented
+		ranges.append(options)
+
+	#Cond objects used as evaluation numbers are compared by their main options
+	nums = []
+	for num in eval_num:
+		num = +num if type(num) in {Cond, LinkedCond} else num
+		if type(num) not in {int, float} or not math.isfinite(num):
+			return NotImplemented
+		nums.append(num)
+
+	coefficients, constant = form
+	coefficient = coefficients.get(keys[0], 0)
+	slope = coefficient * ranges[0].step
+	base = constant + coefficient * ranges[0].start
+
+	#the last variable is the outermost one, so it is first in the product
+	for outer_indexes in itertools.product(*(range(len(options)) for options in reversed(ranges[1:]))):
+		outer_indexes = outer_indexes[::-1]
+		offset = base + sum(coefficients.get(keys[i + 1], 0) * ranges[i + 1][index] for i, index in enumerate(outer_indexes))
+		low, high, excluded = _linearIndexes(slope, offset, eval_sign, nums, len(ranges[0]))
+
+		for index in range(low, high):
+			if index in excluded:
+				continue
+			elif solution_set is None:
+				return (index,) + outer_indexes
+
+			solution_set._addRow((index,) + outer_indexes)
+
+	return solution_set
+
+
+'''
+PRIVATE
+Finds the indexes i, with 0 <= i < length, for which slope * i + offset satisfies all evaluations (with all given eval_nums)
+Returns a tuple of (low, high, excluded): the indexes are the ones from low (inclusive) to high (exclusive) that aren't in excluded
+'''
+def _linearIndexes(slope, offset, eval_sign, eval_num, length):
+
+	low, high, excluded = 0, length, set()
+
+	for num in eval_num:
+		if slope == 0:
+			if not _MainData.evaluation_signs[eval_sign](offset, num):
+				return 0, 0, excluded
+			continue
+
+		#the value of i for which slope * i + offset equals num
+		point = (Fraction(num) - offset) / slope
+
+		if eval_sign == "=":
+			if point.denominator != 1:
+				return 0, 0, excluded
+			low, high = max(low, int(point)), min(high, int(point) + 1)
+		elif eval_sign == "!=":
+			if point.denominator == 1:
+				excluded.add(int(point))
+		#the sign is reversed when dividing by a negative slope
+		elif (eval_sign in {">", ">="}) == (slope > 0):
+			low = max(low, math.floor(point) + 1 if eval_sign in {">", "<"} else math.ceil(point))
+		else:
+			high = min(high, math.ceil(point) if eval_sign in {">", "<"} else math.floor(point) + 1)
+
+	return low, max(low, high), excluded
+
+
+'''
+PRIVATE
+Returns the linear form of the expression in the given ast node, as a tuple of a dict mapping the variables to their coefficients and
+the constant term, or None if the expression isn't linear with integer coefficients
+'''
+def _linearTerms(node):
+
+	if type(node) is ast.Constant:
+		return ({}, node.value) if type(node.value) is int else None
+	elif type(node) is ast.Name:
+		return ({node.id: 1}, 0)
+	elif type(node) is ast.UnaryOp and type(node.op) in {ast.UAdd, ast.USub}:
+		terms = _linearTerms(node.operand)
+		if terms is None or type(node.op) is ast.UAdd:
+			return terms
+		return ({var: -coefficient for var, coefficient in terms[0].items()}, -terms[1])
+	elif type(node) is not ast.BinOp or type(node.op) not in {ast.Add, ast.Sub, ast.Mult, ast.Pow}:
+		return None
+
+	left = _linearTerms(node.left)
+	right = _linearTerms(node.right)
+	if left is None or right is None:
+		return None
+
+	if type(node.op) in {ast.Add, ast.Sub}:
+		sign = 1 if type(node.op) is ast.Add else -1
+		coefficients = dict(left[0])
+		for var, coefficient in right[0].items():
+			coefficients[var] = coefficients.get(var, 0) + sign * coefficient
+		return (coefficients, left[1] + sign * right[1])
+
+	elif type(node.op) is ast.Mult:
+		#one of the factors must be a constant
+		if left[0] and right[0]:
+			return None
+		elif left[0]:
+			left, right = right, left
+		return ({var: left[1] * coefficient for var, coefficient in right[0].items()}, left[1] * right[1])
+
+	#powers are only linear if the exponent is 1; powers of constants are already computed by _foldConstants(), unless they are too large
+	elif right[0] or right[1] != 1:
+		return None
+	return left
+
+
+'''
+PRIVATE
+Finds the first combination that satisfies the equation for each of multiple evaluation numbers, with a single pass over the
+combinations, evaluating the formula only once for each one
+The values of variables_to_cond can be Cond objects or any sequence of options
+Returns a list, holding, for each tuple in eval_nums, the tuple of the indexes of the first combination found (in the order of
+variables_to_cond), or None if no combination was found
+'''
+def _findCombinations(parsed, variables_to_cond, eval_sign, eval_nums):
+
+	formula = parsed.formula
+	results = [None] * len(eval_nums)
+	pending = list(range(len(eval_nums)))
+
+	#linear expressions over ranges of integers are solved directly for each evaluation number; the rest are searched for together
+	if parsed.form is not None:
+		for i in range(len(eval_nums)):
+			results[i] = _findLinear(parsed.form, variables_to_cond, eval_sign, eval_nums[i], None)
+		pending = [i for i in pending if results[i] is NotImplemented]
+		for i in pending:
+			results[i] = None
+		if not pending:
+			return results
+
+	def visit(numbers, indexes):
+		equation_result = _evaluateFormula(formula, numbers)
+		if equation_result is None:
+			return False
+
+		for i in list(pending):
+			if _compareResult(equation_result, eval_sign, eval_nums[i]):
+				results[i] = tuple(indexes)
+				pending.remove(i)
+
+		#stop once every evaluation number has a combination
+		return not pending
+
+	_searchCombinations(variables_to_cond, visit)
+	return results
+
+
+'''
+PRIVATE
+Counts the combinations of options of the objects in variables_to_cond that satisfy the equation, going through each one of them
+The values of variables_to_cond can be Cond objects or any sequence of options
+'''
+def _countCombinations(formula, variables_to_cond, eval_sign, eval_num):
+
+	count = [0]
+
+	def visit(numbers, indexes):
+		if _testEquation(formula, numbers, eval_sign, eval_num):
+			count[0] += 1
+		return False
+
+	_searchCombinations(variables_to_cond, visit)
+	return count[0]
+
+
+'''
+PRIVATE
+Counts the combinations that satisfy the equation for LinkedCond objects, where components holds the _Component of every object in
+variables_to_cond that has one; each combination of the objects in the expression is counted as many times as the combinations of
+each component that agree with it, so the combinations of all linked objects are counted without being joined
+Only the options that appear in the combinations of a component are tried for its objects
+'''
+def _countLinked(formula, variables_to_cond, eval_sign, eval_num, components):
+
+	keys = tuple(variables_to_cond.keys())
+	cond_objects = tuple(variables_to_cond.values())
+	variables_to_cond = dict(variables_to_cond)
+
+	#for every component, the positions in keys of the variables whose objects are in it, and the amount of its combinations
+	#for each combination of options of those objects
+	weights = []
+	for component in components:
+		solutions = component.solutions
+		slots = [i for i in range(len(keys)) if solutions.position(cond_objects[i]) is not None]
+		columns = [solutions.column(cond_objects[i]) for i in slots]
+
+		counts = {}
+		for row in zip(*columns):
+			counts[row] = counts.get(row, 0) + 1
+		weights.append((slots, counts))
+
+		for i, column in zip(slots, columns):
+			variables_to_cond[keys[i]] = _OptionSubset(cond_objects[i], sorted(set(column)))
+
+	count = [0]
+
+	def visit(numbers, indexes):
+		weight = 1
+		for slots, counts in weights:
+			weight *= counts.get(tuple(indexes[i] for i in slots), 0)
+			if not weight:
+				return False
+
+		if _testEquation(formula, numbers, eval_sign, eval_num):
+			count[0] += weight
+		return False
+
+	_searchCombinations(variables_to_cond, visit)
+	return count[0]
+
+
+'''
+PRIVATE
+Counts the combinations that satisfy the equation when the expression in the given (folded) ast node is a sum of parts that don't share
+any variables: the values of every part are counted for the combinations of its own variables, the counts of the parts are combined into
+the counts of two halves, and the values of one half are matched against the sorted values of the other
+Returns None if the expression isn't such a sum, or if any part takes a value that isn't an integer (since floats can't be added
+exactly in a different order)
+'''
+def _countSeparable(node, variables_to_cond, eval_sign, eval_num):
+
+	terms = []
+	_additiveTerms(node, False, terms)
+
+	#group terms that share variables into parts, keeping the terms without variables as a constant
+	parts = []
+	constant = []
+	for term in terms:
+		term_variables = {child.id for child in ast.walk(term) if type(child) is ast.Name}
+		if not term_variables:
+			constant.append(term)
+			continue
+
+		merged = [part for part in parts if part[0] & term_variables]
+		for part in merged:
+			parts.remove(part)
+			term_variables |= part[0]
+		parts.append((term_variables, [term] + [merged_term for part in merged for merged_term in part[1]]))
+
+	if len(parts) < 2:
+		return None
+
+	offset = _evaluateFormula(_compileTerms(constant), {}) if constant else 0
+	if offset is None:
+		return 0
+	elif type(offset) is not int:
+		return None
+
+	counts = []
+	for part_variables, part_terms in parts:
+		part_counts = _countValues(_compileTerms(part_terms), {var: variables_to_cond[var] for var in variables_to_cond if var in part_variables})
+		if part_counts is None:
+			return None
+		counts.append(part_counts)
+
+	#combine the parts into two halves of about the same amount of values
+	counts.sort(key = len, reverse = True)
+	halves = [{offset: 1}, {0: 1}]
+	for part_counts in counts:
+		i = 0 if len(halves[0]) <= len(halves[1]) else 1
+		halves[i] = _combineCounts(halves[i], part_counts)
+
+	left, right = halves
+	values = sorted(right)
+	#cumulative[i] is the amount of combinations of the right half whose value is one of the first i values
+	cumulative = [0]
+	for value in values:
+		cumulative.append(cumulative[-1] + right[value])
+
+	count = 0
+	for value, amount in left.items():
+		if eval_sign == "!=":
+			matching = cumulative[-1] - sum(right.get(num - value, 0) for num in dict.fromkeys(eval_num))
+		elif eval_sign == "=":
+			matching = right.get(eval_num[0] - value, 0)
+		elif eval_sign in {">", ">="}:
+			cut = (bisect.bisect_right if eval_sign == ">" else bisect.bisect_left)(values, eval_num[0] - value)
+			matching = cumulative[-1] - cumulative[cut]
+		else:
+			matching = cumulative[(bisect.bisect_left if eval_sign == "<" else bisect.bisect_right)(values, eval_num[0] - value)]
+
+		count += amount * matching
+
+	return count
+
+
+'''
+PRIVATE
+recursive function used by _countSeparable, adds the terms of the sum in the given ast node to terms, negated if negative is True
+'''
+def _additiveTerms(node, negative, terms):
+
+	if type(node) is ast.BinOp and type(node.op) in {ast.Add, ast.Sub}:
+		_additiveTerms(node.left, negative, terms)
+		_additiveTerms(node.right, negative != (type(node.op) is ast.Sub), terms)
+	elif type(node) is ast.UnaryOp:
+		_additiveTerms(node.operand, negative != (type(node.op) is ast.USub), terms)
+	else:
+		terms.append(ast.UnaryOp(ast.USub(), node) if negative else node)
+
+
+'''
+PRIVATE
+returns the formula of the sum of the given ast nodes
+'''
+def _compileTerms(terms):
+
+	node = terms[0]
+	for term in terms[1:]:
+		node = ast.BinOp(node, ast.Add(), term)
+
+	return compile(ast.fix_missing_locations(ast.Expression(node)), "<expression>", "eval")
+
+
+'''
+PRIVATE
+returns a dict mapping every value that the formula takes for the combinations of options of the objects in variables_to_cond to the
+amount of combinations for which it takes it; combinations for which the formula can't be evaluated aren't counted
+returns None if any of the values isn't an integer
+'''
+def _countValues(formula, variables_to_cond):
+
+	counts = {}
+
+	def visit(numbers, indexes):
+		value = _evaluateFormula(formula, numbers)
+		if value is None:
+			return False
+		elif type(value) is not int:
+			return True
+
+		counts[value] = counts.get(value, 0) + 1
+		return False
+
+	if _searchCombinations(variables_to_cond, visit) is not None:
+		return None
+
+	return counts
+
+
+'''
+PRIVATE
+returns the counts of the sums of values counted in counts1 and counts2 (both dicts mapping values to their counts)
+'''
+def _combineCounts(counts1, counts2):
+
+	combined = {}
+	for value1, amount1 in counts1.items():
+		for value2, amount2 in counts2.items():
+			combined[value1 + value2] = combined.get(value1 + value2, 0) + amount1 * amount2
+
+	return combined
+
+
+'''
+PRIVATE
+Runs in the worker processes of require_many(): interprets the shape of a group of requests once, and solves each problem of the group,
+given as a tuple of (option sequences, evaluation numbers), returning the list of the results of _findCombinations() for each one
+'''
+def _solveGroup(shape, eval_sign, problems):
+	parsed, variables = _interpretShape(shape)
+	return [_findCombinations(parsed, dict(zip(variables, options)), eval_sign, eval_nums) for options, eval_nums in problems]
+
+
+'''
+PRIVATE
+Goes through all combinations of options of the Cond objects in variables_to_cond, calling visit(numbers, indexes) for each one
+numbers is a dict mapping the single-letter variables to the value that they will be tested as, and indexes is a list holding
+the index of the current option of each object, in the order of variables_to_cond; both are reused between calls
+The first variable changes fastest; if visit returns a true value, the search stops and indexes is returned, otherwise None is returned
+'''
+def _searchCombinations(variables_to_cond, visit):
+
+	keys = tuple(variables_to_cond.keys())
+	indexes = [0] * len(keys)
+
+	if _searchLevel(variables_to_cond, keys, len(keys) - 1, {}, indexes, visit):
+		return indexes
+
+	return None
+
+
+'''
+PRIVATE
+recursive function used by _searchCombinations, loops through the options of a single Cond object
+recursion_level -> current recursion level, reduced by one every recursive call, until it hits 0
+'''
+def _searchLevel(variables_to_cond, keys, recursion_level, numbers, indexes, visit):
+
+	#get Cond object to run loop for
+	CondObj = variables_to_cond[keys[recursion_level]]
+	for index, number in (CondObj.enumerate() if type(CondObj) is _OptionSubset else enumerate(CondObj)):
+
+		#map the single-letter variable to the number and keep the index of the number in the Cond object
+		numbers[keys[recursion_level]] = number
+		indexes[recursion_level] = index
+
+		#if all the for loops have been run, test the combination
+		if recursion_level == 0:
+			if visit(numbers, indexes):
+				return True
+
+		#if a deeper recursion level found a combination, stop
+		elif _searchLevel(variables_to_cond, keys, recursion_level - 1, numbers, indexes, visit):
+			return True
+
+	return False
+
+
+'''
+PRIVATE
+tests if given equation is true for the values in numbers
+returns True if given combination satisfies equation, else False
+'''
+def _testEquation(formula, numbers, eval_sign, eval_num):
+	equation_result = _evaluateFormula(formula, numbers)
+	#if evaluation failed, then combination of numbers cannot be right
+	if equation_result is None:
+		return False
+
+	return _compareResult(equation_result, eval_sign, eval_num)
+
+
+'''
+PRIVATE
+calculates the expression result for the values of the single-letter variables in numbers
+returns None if a ZeroDivisionError occurs
+'''
+def _evaluateFormula(formula, numbers):
+	try:
+		return eval(formula, _MainData.eval_globals, numbers)
+	except ZeroDivisionError:
+		return None
+
+
+'''
+PRIVATE
+returns True if the expression result satisfies all evaluations (with all given eval_nums), else False
+'''
+def _compareResult(equation_result, eval_sign, eval_num):
+	for num in eval_num:
+		if not _MainData.evaluation_signs[eval_sign](equation_result, num):
+			return False
+
+	return True
+
+
+'''
+PRIVATE
+Branch and bound search used by require_best()
+Picks options for the variables in the order of variables_to_cond; after each option is picked, the bounds of the expression and of the
+objective are estimated by _boundExpression(), and the option is skipped if the equation can't hold or the objective can't beat the best
+combination found so far; options are tried in order of their objective bounds, so that good combinations are found early
+allowed is the tuple returned by _projectComponents(), whose prefixes the picked indexes must match
+Returns the tuple of the indexes of the best combination, in the order of variables_to_cond, or None if no combination was found
+'''
+def _searchBest(formula, objective_formula, expression, objective, variables_to_cond, eval_sign, eval_num, mode, allowed):
+
+	keys = tuple(variables_to_cond.keys())
+	expression_tree = _parseExpression(expression).tree
+	objective_tree = _parseExpression(objective).tree
+	#Cond objects used as evaluation numbers keep their main options during the search
+	nums = tuple(+num if type(num) in {Cond, LinkedCond} else num for num in eval_num)
+	sign = 1 if mode == "min" else -1
+
+	domains = {}
+	bounds = {}
+	for var in keys:
+		domains[var] = list(enumerate(variables_to_cond[var]))
+		if not domains[var]:
+			return None
+		bounds[var] = (min(number for index, number in domains[var]), max(number for index, number in domains[var]))
+
+	#checks[level] holds the prefixes of allowed combinations to check once the variable at level has been picked
+	checks = [[] for var in keys]
+	for positions, prefixes in allowed:
+		for i, position in enumerate(positions):
+			checks[position].append((positions[:i + 1], prefixes[i]))
+
+	numbers = {}
+	indexes = [0] * len(keys)
+	#objective of the best combination found so far (negated for "max", so that smaller is always better), and its indexes
+	best = [None, None]
+
+	def searchLevel(level):
+		if level == len(keys):
+			if not _testEquation(formula, numbers, eval_sign, nums):
+				return
+
+			value = _evaluateFormula(objective_formula, numbers)
+			if value is not None and (best[0] is None or value * sign < best[0]):
+				best[0] = value * sign
+				best[1] = tuple(indexes)
+			return
+
+		var = keys[level]
+		domain_bounds = bounds[var]
+		candidates = []
+		for index, number in domains[var]:
+			indexes[level] = index
+			if any(tuple(indexes[position] for position in positions) not in prefixes for positions, prefixes in checks[level]):
+				continue
+
+			bounds[var] = (number, number)
+			if not _boundsAllow(_boundExpression(expression_tree, bounds), eval_sign, nums):
+				continue
+
+			low, high = _boundExpression(objective_tree, bounds)
+			candidates.append((low if sign == 1 else -high, index, number))
+
+		candidates.sort(key = lambda candidate: candidate[0])
+		for bound, index, number in candidates:
+			if best[0] is not None and bound >= best[0]:
+				break
+
+			bounds[var] = (number, number)
+			numbers[var] = number
+			indexes[level] = index
+			searchLevel(level + 1)
+
+		bounds[var] = domain_bounds
+
+	searchLevel(0)
+	return best[1]
+
+
+'''
+PRIVATE
+Estimates the smallest and largest values of the expression in the given ast node, when each variable can take any value between the
+bounds given for it in bounds, which maps variables to tuples of (lowest, highest) values
+Returns a tuple of (lowest, highest); the estimate is not always tight, but the real values are always inside it
+Operations whose bounds can't be estimated return (-inf, inf)
+'''
+def _boundExpression(node, bounds):
+
+	unbounded = (-math.inf, math.inf)
+
+	if type(node) is ast.Constant:
+		return (node.value, node.value)
+	elif type(node) is ast.Name:
+		return bounds[node.id]
+	elif type(node) is ast.UnaryOp:
+		low, high = _boundExpression(node.operand, bounds)
+		return (-high, -low) if type(node.op) is ast.USub else (low, high)
+	elif type(node) is not ast.BinOp:
+		return unbounded
+
+	low1, high1 = _boundExpression(node.left, bounds)
+	low2, high2 = _boundExpression(node.right, bounds)
+	op = type(node.op)
+
+	try:
+		if op is ast.Add:
+			return (low1 + low2, high1 + high2)
+		elif op is ast.Sub:
+			return (low1 - high2, high1 - low2)
+		elif op is ast.Mult:
+			return _boundProduct((low1, high1), (low2, high2))
+		elif op is ast.Div and not low2 <= 0 <= high2:
+			return _boundProduct((low1, high1), (1 / high2, 1 / low2))
+		elif op is ast.Mod and low2 == high2 and low2 != 0:
+			return (0, high2) if high2 > 0 else (low2, 0)
+		elif op is ast.Pow and low2 == high2 and type(low2) is int and low2 >= 0:
+			powers = (low1 ** low2, high1 ** low2)
+			if low2 % 2 == 0 and low1 <= 0 <= high1:
+				return (0, max(powers))
+			return (min(powers), max(powers))
+	except OverflowError:
+		pass
+
+	return unbounded
+
+
+'''
+PRIVATE
+returns the bounds of the product of two values, given their bounds as tuples of (lowest, highest)
+'''
+def _boundProduct(bounds1, bounds2):
+	#0 times an infinite bound is taken as 0, since the values themselves are always finite
+	products = [0 if a == 0 or b == 0 else a * b for a in bounds1 for b in bounds2]
+	return (min(products), max(products))
+
+
+'''
+PRIVATE
+returns False if no value between the given bounds (a tuple of (lowest, highest)) can satisfy all evaluations, else True
+'''
+def _boundsAllow(bounds, eval_sign, eval_num):
+	low, high = bounds
+	for num in eval_num:
+		if type(num) is complex:
+			continue
+		elif eval_sign == "=" and not low <= num <= high:
+			return False
+		elif (eval_sign == ">" and high <= num) or (eval_sign == ">=" and high < num):
+			return False
+		elif (eval_sign == "<" and low >= num) or (eval_sign == "<=" and low > num):
+			return False
+		elif eval_sign == "!=" and low == high == num:
+			return False
+
 	return True
 
 
+'''
+PRIVATE
+Min-conflicts local search used by require_local(), over the options of the given objects, for a combination that satisfies all of
+the given limitations
+Returns a dict mapping the IDs of the objects to the indexes of their options in the combination found, or None if none was found
+'''
+def _localSearch(cond_objects, limitations, rng, steps, restarts, deadline):
+
+	#limitations that have to be checked again when the option of each object changes, by ID
+	affected = {id(cond_object): {} for cond_object in cond_objects}
+	for limitation in limitations:
+		for cond_object in limitation.cond_objects + limitation.eval_num:
+			if id(cond_object) in affected:
+				affected[id(cond_object)][limitation] = None
+
+	indexes = {id(cond_object): cond_object._getmain() for cond_object in cond_objects}
+	values = {id(cond_object): cond_object.all()[indexes[id(cond_object)]] for cond_object in cond_objects}
+	objects = {id(cond_object): cond_object for cond_object in cond_objects}
+
+	for attempt in range(restarts):
+		if attempt:
+			for cond_object in cond_objects:
+				indexes[id(cond_object)] = rng.randrange(len(cond_object))
+				values[id(cond_object)] = cond_object.all()[indexes[id(cond_object)]]
+
+		#limitations that don't hold for the current options, kept as dict keys, which acts as an ordered set
+		broken = {limitation: None for limitation in limitations if not limitation.holdsFor(values)}
+
+		for step in range(steps // restarts + (attempt < steps % restarts)):
+			if not broken:
+				return indexes
+			elif deadline is not None and step % 64 == 0 and time.monotonic() > deadline:
+				return None
+
+			limitation = rng.choice(tuple(broken))
+			candidates = [objects[key] for key in dict.fromkeys(id(cond_object) for cond_object in limitation.cond_objects) if len(objects[key]) > 1]
+			if not candidates:
+				continue
+
+			if rng.random() < _MainData.local_search_noise:
+				cond_object = rng.choice(candidates)
+				index = rng.randrange(len(cond_object))
+			else:
+				cond_object, index = _leastBroken(candidates, indexes, values, affected, rng)
+
+			indexes[id(cond_object)] = index
+			values[id(cond_object)] = cond_object.all()[index]
+			for other in affected[id(cond_object)]:
+				if other.holdsFor(values):
+					broken.pop(other, None)
+				else:
+					broken[other] = None
+
+		if not broken:
+			return indexes
+
+	return None
+
+
+'''
+PRIVATE
+Used by _localSearch(): out of the options of the given objects (or a random sample of them, for objects with many options), finds
+the option which, when picked, leaves the fewest limitations of its object broken; ties are broken at random
+Returns a tuple of the object and the index of the option
+'''
+def _leastBroken(candidates, indexes, values, affected, rng):
+
+	best = None
+	ties = 0
+	for cond_object in candidates:
+		options = cond_object.all()
+		current = values[id(cond_object)]
+		sample = range(len(options)) if len(options) <= _MainData.local_search_sample else [rng.randrange(len(options)) for i in range(_MainData.local_search_sample)]
+
+		for index in sample:
+			if index == indexes[id(cond_object)]:
+				continue
+
+			values[id(cond_object)] = options[index]
+			score = sum(not limitation.holdsFor(values) for limitation in affected[id(cond_object)])
+
+			if best is None or score < best[0]:
+				best = (score, cond_object, index)
+				ties = 1
+			elif score == best[0]:
+				ties += 1
+				if rng.randrange(ties) == 0:
+					best = (score, cond_object, index)
+
+		values[id(cond_object)] = current
+
+	return best[1], best[2]
+
+
+'''
+PRIVATE
+Limitation record, set on LinkedCond objects by require()
+Records are interned in _MainData.limitations by their canonical key (expression, identities of the objects, evaluation sign and
+evaluation numbers, where Cond objects are also compared by identity), so two equal limitations are always the same object;
+this makes identity equality and the precomputed hash of the key consistent, and lets records be kept in sets and dicts
+The expression part of the text returned by LinkedCond.getlims() is rendered once, when the record is created; the evaluation numbers
+are rendered on each call, since Cond objects among them may have changed their main options
+'''
+class _Limitation:
+
+	__slots__ = ("expression", "cond_objects", "eval_sign", "eval_num", "prefix", "key", "hash", "dynamic", "parsed", "formula", "variables", "__weakref__")
+
+	def __init__(self, expression, cond_objects, eval_sign, eval_num, key):
+		self.expression = expression
+		self.cond_objects = cond_objects
+		self.eval_sign = eval_sign
+		self.eval_num = eval_num
+		self.prefix = _renderLimitation(expression, cond_objects, eval_sign)
+		self.key = key
+		self.hash = hash(key)
+		#limitations with Cond objects as evaluation numbers depend on their main options, so their results can't be cached
+		self.dynamic = any(type(num) in {Cond, LinkedCond} for num in eval_num)
+		self.parsed = _parseExpression(expression)
+		self.formula = self.parsed.formula
+		self.variables = _mapVariablesToCond(expression, cond_objects)
+
+	@property
+	def text(self):
+		#the string returned by LinkedCond.getlims() for the limitation
+		if len(self.eval_num) > 1:
+			return self.prefix + str(self.eval_num)
+		return self.prefix + str(self.eval_num[0])
+
+	def solve(self, cond_object = None, index = None):
+		#returns SolutionSet of all combinations satisfying the limitation; if cond_object is given, only combinations
+		#where it has the option at index are found
+		variables_to_cond = dict(self.variables)
+		solution_set = SolutionSet(variables_to_cond.values())
+
+		if cond_object is not None:
+			for var in variables_to_cond:
+				if variables_to_cond[var] is cond_object:
+					variables_to_cond[var] = _OptionSubset(cond_object, (index,))
+
+		return _findCombination(self.parsed, variables_to_cond, self.eval_sign, self.eval_num, solution_set)
+
+	def holds(self):
+		#returns True if the main options of the objects satisfy the limitation
+		numbers = {var: +self.variables[var] for var in self.variables}
+		return _testEquation(self.formula, numbers, self.eval_sign, self.eval_num)
+
+	def holdsFor(self, values):
+		#returns True if the limitation holds when each object has the value mapped to its ID in values; Cond objects used as
+		#evaluation numbers that aren't in values keep their main options
+		numbers = {var: values[id(self.variables[var])] for var in self.variables}
+		eval_num = tuple(values.get(id(num), num) for num in self.eval_num) if self.dynamic else self.eval_num
+		return _testEquation(self.formula, numbers, self.eval_sign, eval_num)
+
+	def __hash__(self):
+		return self.hash
+
+	def __reduce__(self):
+		#records are interned again when unpickled, since their keys include the IDs of the objects
+		return (_getLimitation, (self.expression, self.cond_objects, self.eval_sign, self.eval_num))
+
+	def __repr__(self):
+		return "<limitation {}>".format(self.text)
+
+
+'''
+PRIVATE
+returns the _Limitation record for the given arguments of require(), creating it if it doesn't exist
+'''
+def _getLimitation(expression, cond_objects, eval_sign, eval_num):
+
+	key = (
+		_interpretExpression(expression, len(cond_objects), return_str = True),
+		tuple(id(cond_object) for cond_object in cond_objects),
+		eval_sign,
+		tuple((type(num), id(num)) if type(num) in {Cond, LinkedCond} else num for num in eval_num)
+	)
+
+	limitation = _MainData.limitations.get(key)
+	if limitation is None:
+		limitation = _Limitation(expression, cond_objects, eval_sign, eval_num, key)
+		_MainData.limitations[key] = limitation
+
+	return limitation
+
+
+'''
+PRIVATE
+attaches to an existing shared memory segment
+on Python versions that support it, the segment is not registered with the resource tracker, since this process doesn't own it
+'''
+def _openSegment(segment_name):
+	try:
+		return shared_memory.SharedMemory(name = segment_name, track = False)
+	except TypeError:
+		return shared_memory.SharedMemory(name = segment_name)
+
+
+'''
+PRIVATE
+called when a _SharedOptions storage is garbage-collected: releases its view and drops the reference count of its segment,
+closing the segment when it reaches zero (and unlinking it, if it was created by this process)
+'''
+def _releaseSegment(segment_name, view):
+	view.release()
+
+	entry = _MainData.segments.get(segment_name)
+	if entry is None or entry[3] != os.getpid():
+		return
+
+	entry[1] -= 1
+	if entry[1] == 0:
+		del _MainData.segments[segment_name]
+		entry[0].close()
+		if entry[2]:
+			entry[0].unlink()
+
+
+'''
+PRIVATE
+returns the array.array typecode that can store the items of a buffer with the given struct format
+only integer and floating point formats in native byte order are accepted; for anything else, None is returned
+'''
+def _bufferTypecode(fmt):
+	native = True
+	if fmt and fmt[0] in "@=<>!":
+		if fmt[0] in _MainData.byte_orders and _MainData.byte_orders[fmt[0]] != sys.byteorder:
+			return None
+		native = fmt[0] == "@"
+		fmt = fmt[1:]
+
+	if len(fmt) != 1 or fmt not in _MainData.buffer_formats:
+		return None
+
+	size = struct.calcsize(("@" if native else "=") + fmt)
+	if fmt in "fd":
+		candidates = "fd"
+	elif fmt.islower():
+		candidates = "bhilq"
+	else:
+		candidates = "BHILQ"
+
+	#prefer the same typecode, so that array.array objects keep their own one
+	for typecode in fmt + candidates:
+		if array(typecode).itemsize == size:
+			return typecode
+
+	return None
+
+
 '''
 PRIVATE
 TypeChangeError: thrown whenever an operation onto a Cond object (usually incrementing, decrementing, etc)
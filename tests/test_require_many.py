@@ -0,0 +1,56 @@
+import unittest
+
+from cond import Cond, LinkedCond, require, require_many
+
+
+def build():
+	#Cond requests over different objects with the same shape, LinkedCond requests and requests using Cond evaluation numbers,
+	#which are run one by one after the independent ones
+	objects = [Cond(range = 50) for i in range(4)] + [Cond(3, 5, 7, 11)]
+	linked = [LinkedCond(range = 10) for i in range(2)]
+	requests = [
+		("x + 2y", (objects[0], objects[1]), "=", 60),
+		("a + 2b", (objects[2], objects[3]), "=", 31),
+		("x + 2y", (objects[0], objects[1]), "=", 1000),
+		("xy", (objects[4], objects[0]), "=", 77),
+		("x - y", (objects[2], objects[3]), ">", objects[4]),
+		("xy", tuple(linked), "=", 24),
+		("x - y", tuple(linked), ">", 0),
+		("x", linked[0], "<", 3),
+	]
+	return objects + linked, requests
+
+
+class RequireManyTest(unittest.TestCase):
+
+	def check(self, workers):
+		expected_objects, requests = build()
+		expected = [require(*request) for request in requests]
+
+		objects, requests = build()
+		self.assertEqual(require_many(requests, workers = workers), expected)
+		self.assertEqual([int(cond_object) for cond_object in objects], [int(cond_object) for cond_object in expected_objects])
+
+	def test_same_results_as_require(self):
+		self.check(None)
+
+	def test_same_results_as_require_with_workers(self):
+		self.check(2)
+
+	def test_shared_options_with_workers(self):
+		x = Cond(*range(0, 300, 3))
+		y = Cond(*range(1, 300, 7))
+		x.share()
+		y.share()
+		results = require_many([("x + y", (x, y), "=", n) for n in (100, 3, 299)], workers = 2)
+		self.assertEqual(results, [True, False, True])
+		self.assertEqual(int(x) + int(y), 299)
+
+	def test_no_independent_requests_with_workers(self):
+		a = LinkedCond(range = 5)
+		self.assertEqual(require_many([("x", a, ">", 2)], workers = 2), [True])
+		self.assertEqual(require_many([], workers = 2), [])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,64 @@
+import pickle
+import unittest
+
+from cond import Cond, LinkedCond, require, restore, snapshot
+
+
+def network():
+	a = LinkedCond(range = 10, name = "a")
+	b = LinkedCond(range = 10, name = "b")
+	c = LinkedCond(2.5, 3.5, 4.5, name = "c")
+	limit = Cond(1, 2, 5)
+	require("xy", (a, b), "=", 24)
+	require("x - y", (a, b), ">", limit)
+	require("x + y", (a, c), "<", 10)
+	return a, b, c, limit
+
+
+class SnapshotTest(unittest.TestCase):
+
+	def assertSameNetwork(self, original, copied):
+		for old, new in zip(original, copied):
+			self.assertIsNot(old, new)
+			self.assertEqual(list(new), list(old))
+			self.assertEqual(+new, +old)
+			self.assertEqual(new.getname(), old.getname())
+			if type(old) is LinkedCond:
+				self.assertEqual(new.getlims(), old.getlims())
+
+	def test_round_trip(self):
+		original = network()
+		copied = restore(snapshot(original))
+		self.assertSameNetwork(original, copied)
+
+		#restored objects keep solving from the restored limitations, without changing the original ones
+		a, b, c, limit = copied
+		self.assertFalse(require("x", a, "!=", 6))
+		self.assertTrue(require("x", c, "=", 3.5))
+		self.assertEqual((int(a), int(b), +c), (6, 4, 3.5))
+		self.assertEqual(+original[2], 2.5)
+		self.assertEqual(original[0].getlims(), {"a*b = 24", "a-b > 1", "a+c < 10"})
+
+	def test_evaluation_numbers_are_restored(self):
+		a, b, c, limit = restore(snapshot(network()))
+		limit += 4
+		self.assertEqual(a.getlims(), {"a*b = 24", "a-b > 5", "a+c < 10"})
+		self.assertFalse(a.consistent())
+
+	def test_complex_options(self):
+		x = Cond(1j, 2 + 3j, -1.5j, mainpos = 1)
+		(y,) = restore(snapshot(x))
+		self.assertEqual(list(y), list(x))
+		self.assertEqual(+y, 2 + 3j)
+
+	def test_bad_data(self):
+		with self.assertRaises(ValueError):
+			restore(b"not a snapshot")
+
+	def test_pickle_round_trip(self):
+		original = network()
+		self.assertSameNetwork(original, pickle.loads(pickle.dumps(original)))
+
+
+if __name__ == "__main__":
+	unittest.main()
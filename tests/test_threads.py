@@ -0,0 +1,120 @@
+import threading
+import unittest
+
+import cond
+from cond import Cond, LinkedCond, require, deferred
+
+
+def run_threads(test, targets, timeout = 30):
+	#runs each target in a daemon thread, failing the test if any of them is still running after timeout seconds or raised
+	errors = []
+
+	def wrap(target):
+		def run():
+			try:
+				target()
+			except BaseException as error:
+				errors.append(error)
+		return run
+
+	threads = [threading.Thread(target = wrap(target), daemon = True) for target in targets]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join(timeout = timeout)
+
+	test.assertFalse(any(thread.is_alive() for thread in threads), "threads did not finish")
+	test.assertEqual(errors, [])
+
+
+class RequireThreadsTest(unittest.TestCase):
+
+	def test_linked_requires_from_many_threads(self):
+		#every thread adds limitations to the same network of linked objects, which must hold together at the end
+		a = LinkedCond(range = 20)
+		b = LinkedCond(range = 20)
+		c = LinkedCond(range = 20)
+		require("x + y + z", (a, b, c), "<", 40)
+		results = []
+
+		def run(k):
+			def target():
+				for i in range(5):
+					results.append(require("x - y", (a, b), "!=", k * 5 + i))
+					results.append(require("x + y", (b, c), ">", k))
+			return target
+
+		run_threads(self, [run(k) for k in range(4)])
+
+		self.assertTrue(all(results))
+		self.assertTrue(a.consistent())
+		self.assertTrue(int(a) + int(b) + int(c) < 40)
+		self.assertTrue(int(b) + int(c) > 3)
+		self.assertTrue(all(int(a) - int(b) != n for n in range(20)))
+
+	def test_linear_requires_from_many_threads(self):
+		#parsed expressions are dropped from the cache while other threads are solving them in closed form
+		def run(k):
+			def target():
+				for j in range(50):
+					x = Cond(range = 1000)
+					y = Cond(range = 1000)
+					self.assertTrue(require("x + {}y + {}".format(k + 2, j), (x, y), "=", 900 + j))
+					self.assertEqual(int(x) + (k + 2) * int(y), 900)
+					cond._parseExpression.cache_clear()
+			return target
+
+		run_threads(self, [run(k) for k in range(8)])
+
+
+class DeferredThreadsTest(unittest.TestCase):
+
+	def test_other_threads_see_main_options_before_queued_calls(self):
+		x = Cond(1, 2, 3, 4)
+		queued = threading.Event()
+		read = threading.Event()
+		seen = []
+
+		def owner():
+			with deferred() as context:
+				require("a", x, "=", 3)
+				queued.set()
+				read.wait(10)
+			seen.append(context.results)
+
+		def reader():
+			queued.wait(10)
+			seen.append(int(x))
+			read.set()
+
+		run_threads(self, [owner, reader])
+
+		self.assertEqual(seen, [1, [True]])
+		self.assertEqual(int(x), 3)
+
+	def test_crossed_deferred_requires_do_not_deadlock(self):
+		#each thread queues a call on its own object, then requires the object queued by the other thread
+		a = Cond(1, 2, 3)
+		b = Cond(1, 2, 3)
+		queued = threading.Barrier(2)
+		results = {}
+
+		def run(name, own, other):
+			def target():
+				with deferred() as context:
+					require("x", own, "=", 2)
+					queued.wait()
+					require("x", other, "=", 3)
+				results[name] = context.results
+			return target
+
+		run_threads(self, [run("a", a, b), run("b", b, a)], timeout = 10)
+
+		self.assertEqual(results["a"], [True, True])
+		self.assertEqual(results["b"], [True, True])
+		self.assertEqual(int(a), 3)
+		self.assertEqual(int(b), 3)
+
+
+if __name__ == "__main__":
+	unittest.main()